@@ -7,16 +7,47 @@
 import os
 import time
 import hashlib
-from typing import Dict, Optional
+import hmac
+from typing import Dict, NamedTuple, Optional
 from datetime import datetime, timedelta
 
+# Как часто (сек) подсчет активных сессий проходит по всем сессиям и удаляет истекшие:
+# меню менеджера обновляется часто, а счетчик с точностью до секунды не нужен
+SESSIONS_CLEANUP_INTERVAL = 1.0
+
+
+class ManagerSession:
+    """Сессия менеджера (слоты вместо словаря на каждую сессию)"""
+    
+    __slots__ = ('user_id', 'created_at', 'last_activity', 'session_token', 'expires_at')
+    
+    def __init__(self, user_id: int, created_at: float, session_token: str, expires_at: float):
+        self.user_id = user_id
+        self.created_at = created_at
+        self.last_activity = created_at
+        self.session_token = session_token
+        self.expires_at = expires_at
+
+
+class ManagerSessionInfo(NamedTuple):
+    """Неизменяемый снимок сессии менеджера для внешнего кода"""
+    
+    user_id: int
+    created_at: float
+    last_activity: float
+    session_token: str
+    expires_at: float
+
+
 class AuthManager:
     """Менеджер авторизации для управления доступом менеджеров"""
     
     def __init__(self):
         self.manager_password = os.getenv('MANAGER_PASSWORD', 'admin123')
+        self._password_bytes = self.manager_password.encode()
         self.session_timeout = int(os.getenv('MANAGER_SESSION_TIMEOUT', '3600'))  # 1 час
-        self.active_sessions: Dict[int, Dict] = {}  # user_id -> session_info
+        self.active_sessions: Dict[int, ManagerSession] = {}  # user_id -> session
+        self._next_cleanup = 0.0  # time.monotonic() следующей очистки при подсчете сессий
     
     def authenticate(self, user_id: int, password: str) -> bool:
         """
@@ -29,7 +60,8 @@ class AuthManager:
         Returns:
             bool: True если аутентификация успешна
         """
-        if password == self.manager_password:
+        # Сравнение за постоянное время; дешевая операция, выносить в поток не нужно
+        if hmac.compare_digest(password.encode(), self._password_bytes):
             self._create_session(user_id)
             return True
         return False
@@ -53,7 +85,7 @@ class AuthManager:
             return False
         
         # Обновляем время последней активности
-        session['last_activity'] = time.time()
+        session.last_activity = time.time()
         return True
     
     def logout(self, user_id: int) -> bool:
@@ -68,7 +100,7 @@ class AuthManager:
         """
         return self._remove_session(user_id)
     
-    def get_session_info(self, user_id: int) -> Optional[Dict]:
+    def get_session_info(self, user_id: int) -> Optional[ManagerSessionInfo]:
         """
         Получение информации о сессии
         
@@ -76,10 +108,14 @@ class AuthManager:
             user_id: ID пользователя Telegram
             
         Returns:
-            Dict или None: Информация о сессии
-        """
-        if user_id in self.active_sessions and not self._is_session_expired(self.active_sessions[user_id]):
-            return self.active_sessions[user_id].copy()
+            ManagerSessionInfo или None: Снимок сессии (изменения не влияют на саму сессию)
+        """
+        session = self.active_sessions.get(user_id)
+        if session is not None and not self._is_session_expired(session):
+            return ManagerSessionInfo(
+                session.user_id, session.created_at, session.last_activity,
+                session.session_token, session.expires_at
+            )
         return None
     
     def cleanup_expired_sessions(self) -> int:
@@ -106,7 +142,10 @@ class AuthManager:
         Returns:
             int: Количество активных сессий
         """
-        self.cleanup_expired_sessions()
+        now = time.monotonic()
+        if now >= self._next_cleanup:
+            self.cleanup_expired_sessions()
+            self._next_cleanup = now + SESSIONS_CLEANUP_INTERVAL
         return len(self.active_sessions)
     
     def _create_session(self, user_id: int) -> None:
@@ -114,13 +153,9 @@ class AuthManager:
         now = time.time()
         session_token = self._generate_session_token(user_id, now)
         
-        self.active_sessions[user_id] = {
-            'user_id': user_id,
-            'created_at': now,
-            'last_activity': now,
-            'session_token': session_token,
-            'expires_at': now + self.session_timeout
-        }
+        self.active_sessions[user_id] = ManagerSession(
+            user_id, now, session_token, now + self.session_timeout
+        )
     
     def _remove_session(self, user_id: int) -> bool:
         """Удаление сессии"""
@@ -129,9 +164,9 @@ class AuthManager:
             return True
         return False
     
-    def _is_session_expired(self, session: Dict) -> bool:
+    def _is_session_expired(self, session: ManagerSession) -> bool:
         """Проверка истечения сессии"""
-        return time.time() > session['expires_at']
+        return time.time() > session.expires_at
     
     def _generate_session_token(self, user_id: int, timestamp: float) -> str:
         """Генерация токена сессии"""
@@ -155,7 +190,7 @@ class AuthManager:
         if self._is_session_expired(session):
             return 0
         
-        return int(session['expires_at'] - time.time())
+        return int(session.expires_at - time.time())
     
     def extend_session(self, user_id: int, additional_time: int = None) -> bool:
         """
@@ -175,8 +210,9 @@ class AuthManager:
             additional_time = self.session_timeout
         
         session = self.active_sessions[user_id]
-        session['expires_at'] = time.time() + additional_time
-        session['last_activity'] = time.time()
+        now = time.time()
+        session.expires_at = now + additional_time
+        session.last_activity = now
         
         return True
 
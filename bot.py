@@ -6,13 +6,17 @@
 Включает систему авторизации менеджеров и расширенный интерфейс
 """
 
+import asyncio
 import logging
 import sqlite3
 import os
-import csv
-from datetime import datetime
-from typing import Dict, Any
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
+import re
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, List
+from telegram import Update, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
+from telegram.constants import ParseMode
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -25,6 +29,7 @@ from telegram.ext import (
 
 # Импорт новых модулей
 from dialog_config import DIALOG_TEXTS, BUTTONS, SETTINGS, FILES
+from static_markup import StaticInlineKeyboardMarkup
 from auth_manager import auth_manager
 from user_interface import UserInterface
 from manager_interface import ManagerInterface
@@ -34,12 +39,25 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Настройка логирования
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Уровни по имени из LOG_LEVEL; неизвестное значение дает INFO, а не AttributeError
+LOG_LEVELS = {
+    'NOTSET': logging.NOTSET,
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'WARN': logging.WARN,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL,
+    'FATAL': logging.FATAL,
+}
+
 log_level = os.getenv('LOG_LEVEL', 'INFO')
 log_file = os.getenv('LOG_FILE')
 
 logging_config = {
-    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    'level': getattr(logging, log_level.upper())
+    'format': LOG_FORMAT,
+    'level': LOG_LEVELS.get(log_level.upper(), logging.INFO)
 }
 
 if log_file:
@@ -51,10 +69,169 @@ logger = logging.getLogger(__name__)
 # Состояния диалога
 WAITING_NAME, WAITING_EXPERIENCE, WAITING_AGE, FINAL_CONSENT = range(4)
 
+# Фильтр обычного текстового ввода (без команд), собирается один раз
+TEXT_INPUT = filters.TEXT & ~filters.COMMAND
+
+# Клавиатуры диалога регистрации (статичные, создаются один раз)
+DATA_CONSENT_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton(BUTTONS['data_consent']['yes'], callback_data="data_consent_yes")],
+    [InlineKeyboardButton(BUTTONS['data_consent']['no'], callback_data="data_consent_no")]
+])
+
+EXPERIENCE_MARKUP = ReplyKeyboardMarkup(
+    [
+        [KeyboardButton(BUTTONS['experience']['yes'])],
+        [KeyboardButton(BUTTONS['experience']['no'])]
+    ],
+    resize_keyboard=True,
+    one_time_keyboard=True
+)
+
+NEWSLETTER_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton(BUTTONS['newsletter']['yes'], callback_data="newsletter_yes")],
+    [InlineKeyboardButton(BUTTONS['newsletter']['no'], callback_data="newsletter_no")]
+])
+
+# Подтверждение очистки БД в устаревшем меню менеджера
+CLEAR_CONFIRM_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("✅ Да, удалить все", callback_data="confirm_clear")],
+    [InlineKeyboardButton("❌ Отмена", callback_data="manager_cancel")]
+])
+
+# Тексты диалога регистрации, собранные заранее (в шаблонах остается только {name})
+NAME_RECEIVED_TEMPLATE = (
+    f"{DIALOG_TEXTS['name_received']['greeting']}\n\n"
+    f"{DIALOG_TEXTS['name_received']['question']}"
+)
+
+NOTIFICATIONS_TEMPLATE = (
+    f"{DIALOG_TEXTS['notifications']['final_greeting']}\n\n"
+    f"{DIALOG_TEXTS['notifications']['info']}"
+)
+
+SNAOP_CAPTION_TEMPLATE = (
+    f"{NOTIFICATIONS_TEMPLATE}\n\n"
+    f"📄 <b>Согласие на обработку персональных данных</b>"
+)
+
+# Ответы на вопрос об опыте: (значение для БД, текст ответа с вопросом о возрасте)
+EXPERIENCE_YES = ("Да", f"{DIALOG_TEXTS['experience']['yes_response']}\n\n{DIALOG_TEXTS['age']['question']}")
+EXPERIENCE_NO = ("Нет", f"{DIALOG_TEXTS['experience']['no_response']}\n\n{DIALOG_TEXTS['age']['question']}")
+
+# Нажатия кнопок клавиатуры сопоставляются с ответом без разбора текста
+EXPERIENCE_REPLIES = MappingProxyType({
+    BUTTONS['experience']['yes']: EXPERIENCE_YES,
+    BUTTONS['experience']['no']: EXPERIENCE_NO,
+})
+
+# Ответы на вопрос о рассылке: (согласие, текст ответа, статус в сводке)
+NEWSLETTER_ACCEPTED = (True, DIALOG_TEXTS['newsletter']['yes_response'], '✅')
+NEWSLETTER_DECLINED = (False, DIALOG_TEXTS['newsletter']['no_response'], '❌')
+
+NEWSLETTER_REPLIES = MappingProxyType({
+    "newsletter_yes": NEWSLETTER_ACCEPTED,
+    "newsletter_no": NEWSLETTER_DECLINED,
+})
+
+# Неизменяемые части итогового сообщения о регистрации
+REGISTRATION_SUMMARY_TEMPLATE = DIALOG_TEXTS['registration_complete']['summary_template']
+
+REGISTRATION_COMPLETE_HEAD = (
+    f"\n\n{DIALOG_TEXTS['registration_complete']['title']}\n\n"
+    f"{DIALOG_TEXTS['registration_complete']['summary_title']}\n"
+)
+
+REGISTRATION_COMPLETE_TAIL = (
+    f"\n\n{DIALOG_TEXTS['registration_complete']['welcome']}\n"
+    f"{DIALOG_TEXTS['registration_complete']['next_steps']}"
+)
+
+# Проверка возраста: границы и текст ошибки не меняются во время работы
+MIN_AGE = SETTINGS['age_limits']['min']
+MAX_AGE = SETTINGS['age_limits']['max']
+# Возраст принимается только цифрами (диапазон проверяет get_age); остальной текст уходит в invalid_age_format
+AGE_INPUT = filters.Regex(r'^\s*\d+\s*$') & ~filters.COMMAND
+INVALID_AGE_TEXT = DIALOG_TEXTS['age']['invalid_age'].format(min_age=MIN_AGE, max_age=MAX_AGE)
+
+# Сводная статистика для /admin одним запросом (вместо отдельного SELECT на каждый показатель)
+ADMIN_STATS_QUERY = """
+    SELECT COUNT(*),
+           COALESCE(SUM(newsletter_consent = 1), 0),
+           COALESCE(SUM(english_experience = 'Да'), 0),
+           AVG(age)
+    FROM users
+"""
+
 # Токен бота (получить у @BotFather)
 BOT_TOKEN = os.getenv('BOT_TOKEN', 'YOUR_BOT_TOKEN_HERE')
 DATABASE_PATH = os.getenv('DATABASE_PATH', 'english_club.db')
 
+# Схема БД (индексы - те же, что создает manage.py init)
+DATABASE_SCHEMA_SQL = """
+    -- WAL сохраняется в файле БД: читатели не блокируют запись, меньше fsync
+    PRAGMA journal_mode=WAL;
+    
+    BEGIN;
+    
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        telegram_id INTEGER UNIQUE NOT NULL,
+        username TEXT,
+        name TEXT NOT NULL,
+        age INTEGER,
+        english_experience TEXT,
+        data_consent BOOLEAN DEFAULT 0,
+        newsletter_consent BOOLEAN DEFAULT 0,
+        registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    
+    -- Постраничный список пользователей менеджера читает строки по этому индексу от ключа
+    -- (он же заменяет прежний индекс только по registration_date)
+    DROP INDEX IF EXISTS idx_users_registration_date;
+    CREATE INDEX IF NOT EXISTS idx_users_registration_keyset
+    ON users(registration_date DESC, telegram_id DESC);
+    
+    -- Частичный индекс только по подписчикам: рассылка и счетчик подписчиков не читают всю таблицу
+    CREATE INDEX IF NOT EXISTS idx_users_newsletter
+    ON users(newsletter_consent) WHERE newsletter_consent = 1;
+    
+    COMMIT;
+"""
+
+# Пакетная запись регистраций: максимум записей в пачке и время ожидания пачки (сек)
+REGISTRATION_BATCH_SIZE = 32
+REGISTRATION_FLUSH_INTERVAL = 0.2
+# Повторы записи пачки при ошибке (например, БД заблокирована manage.py clear): число попыток и пауза (сек)
+REGISTRATION_RETRY_ATTEMPTS = 5
+REGISTRATION_RETRY_DELAY = 1.0
+
+# Время жизни снимка статистики /admin (сек): повторные запросы обслуживаются из кэша
+ADMIN_STATS_TTL = 2.0
+
+# Маршруты пользовательских callback'ов: callback_data -> метод UserInterface
+USER_CALLBACK_ROUTES = MappingProxyType({
+    "user_menu": "show_user_menu",
+    "user_profile": "show_user_profile",
+    "user_help": "show_user_help",
+    "user_settings": "show_user_settings",
+    "user_delete_confirm": "confirm_delete_account",
+    "user_delete_confirmed": "delete_user_account",
+    "user_support": "show_support_info",
+    "user_materials": "show_materials",
+})
+
+# Маршруты менеджерских callback'ов: callback_data -> метод ManagerInterface
+MANAGER_CALLBACK_ROUTES = MappingProxyType({
+    "mgr_menu": "show_manager_menu",
+    "mgr_stats": "show_detailed_stats",
+    "mgr_export": "export_users_data",
+    "mgr_broadcast": "start_broadcast",
+    "mgr_broadcast_confirm": "confirm_broadcast",
+    "mgr_broadcast_cancel": "cancel_broadcast",
+    "mgr_settings": "show_bot_settings",
+    "mgr_logout": "logout",
+})
+
 class EnglishClubBot:
     def __init__(self):
         self.db_path = DATABASE_PATH
@@ -63,77 +240,222 @@ class EnglishClubBot:
         # Инициализируем интерфейсы
         self.user_interface = UserInterface(self.db_path)
         self.manager_interface = ManagerInterface(self.db_path)
+        
+        # Таблицы диспетчеризации callback'ов: методы связываются один раз при создании
+        self.user_callback_handlers = {
+            data: getattr(self.user_interface, name) for data, name in USER_CALLBACK_ROUTES.items()
+        }
+        self.manager_callback_handlers = {
+            data: getattr(self.manager_interface, name) for data, name in MANAGER_CALLBACK_ROUTES.items()
+        }
+        
+        # Очередь регистраций для пакетной записи в БД
+        self.registration_queue: asyncio.Queue = asyncio.Queue()
+        self._registration_writer = None
+        
+        # Снимок статистики /admin: (время получения, результат); блокировка объединяет параллельные запросы
+        self._admin_stats_cache = None
+        self._admin_stats_lock = asyncio.Lock()
     
     def init_database(self):
         """Инициализация базы данных"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                telegram_id INTEGER UNIQUE NOT NULL,
-                username TEXT,
-                name TEXT NOT NULL,
-                age INTEGER,
-                english_experience TEXT,
-                data_consent BOOLEAN DEFAULT 0,
-                newsletter_consent BOOLEAN DEFAULT 0,
-                registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
+        # Вся схема одним скриптом и одной транзакцией
+        conn.executescript(DATABASE_SCHEMA_SQL)
         conn.close()
         logger.info("База данных инициализирована")
     
     def save_user_data(self, user_data: Dict[str, Any]):
         """Сохранение данных пользователя в БД"""
+        self.save_users_data([user_data])
+    
+    def save_users_data(self, users: List[Dict[str, Any]]):
+        """Сохранение пачки пользователей в БД одной транзакцией"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            cursor = conn.cursor()
+            
+            cursor.executemany('''
+                INSERT OR REPLACE INTO users 
+                (telegram_id, username, name, age, english_experience, data_consent, newsletter_consent)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    user_data['telegram_id'],
+                    user_data.get('username', ''),
+                    user_data['name'],
+                    user_data.get('age'),
+                    user_data.get('english_experience'),
+                    user_data.get('data_consent', False),
+                    user_data.get('newsletter_consent', False)
+                )
+                for user_data in users
+            ])
+            
+            conn.commit()
+        finally:
+            conn.close()
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO users 
-            (telegram_id, username, name, age, english_experience, data_consent, newsletter_consent)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_data['telegram_id'],
-            user_data.get('username', ''),
-            user_data['name'],
-            user_data.get('age'),
-            user_data.get('english_experience'),
-            user_data.get('data_consent', False),
-            user_data.get('newsletter_consent', False)
-        ))
+        for user_data in users:
+            self.user_interface.mark_registered(user_data['telegram_id'])
+            logger.info("Пользователь %s сохранен в БД", user_data['name'])
+    
+    async def queue_user_data(self, user_data: Dict[str, Any]):
+        """Поставить данные пользователя в очередь на пакетную запись"""
+        # Без работающей фоновой задачи пишем сразу, иначе очередь никто не прочитает
+        if self._registration_writer is None or self._registration_writer.done():
+            self.save_user_data(user_data)
+            return
+        # Пользователь уже считается зарегистрированным, хотя запись в БД еще впереди
+        self.user_interface.mark_registered(user_data['telegram_id'])
+        # Копируем: context.user_data очищается сразу после регистрации
+        await self.registration_queue.put(dict(user_data))
+    
+    def start_registration_writer(self):
+        """Запуск фоновой задачи пакетной записи регистраций"""
+        if self._registration_writer is None:
+            self._registration_writer = asyncio.create_task(self._write_registrations())
+    
+    async def stop_registration_writer(self):
+        """Остановка фоновой записи с сохранением оставшихся регистраций"""
+        if self._registration_writer is None:
+            return
+        writer, self._registration_writer = self._registration_writer, None
+        # Упавшая задача уже записала ошибку и несохраненные данные в лог
+        if writer.done():
+            writer.exception()
+            return
+        await self.registration_queue.put(None)
+        await writer
+    
+    async def _write_registrations(self):
+        """Сбор регистраций в пачки и запись через executemany"""
+        loop = asyncio.get_running_loop()
+        stopping = False
         
-        conn.commit()
-        conn.close()
-        logger.info(f"Пользователь {user_data['name']} сохранен в БД")
+        while not stopping:
+            user_data = await self.registration_queue.get()
+            if user_data is None:
+                break
+            
+            batch = [user_data]
+            deadline = loop.time() + REGISTRATION_FLUSH_INTERVAL
+            while len(batch) < REGISTRATION_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    user_data = await asyncio.wait_for(self.registration_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if user_data is None:
+                    stopping = True
+                    break
+                batch.append(user_data)
+            
+            await self._save_batch(batch)
+    
+    async def _save_batch(self, batch: List[Dict[str, Any]]):
+        """Запись пачки с повторами при ошибках SQLite; прочие ошибки останавливают фоновую задачу"""
+        for attempt in range(1, REGISTRATION_RETRY_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self.save_users_data, batch)
+                return
+            except sqlite3.Error:
+                logger.exception(
+                    "Не удалось сохранить пачку регистраций (%d шт.), попытка %d из %d",
+                    len(batch), attempt, REGISTRATION_RETRY_ATTEMPTS
+                )
+            except Exception:
+                # Ошибка в коде: повтор не поможет. Дальше регистрации пишутся напрямую (см. queue_user_data),
+                # а уже стоящие в очереди попадают в лог вместе с текущей пачкой
+                logger.exception("Фоновая запись регистраций остановлена")
+                while not self.registration_queue.empty():
+                    user_data = self.registration_queue.get_nowait()
+                    if user_data is not None:
+                        batch.append(user_data)
+                self._log_unsaved(batch)
+                raise
+            if attempt < REGISTRATION_RETRY_ATTEMPTS:
+                await asyncio.sleep(REGISTRATION_RETRY_DELAY * attempt)
+        
+        self._log_unsaved(batch)
+    
+    @staticmethod
+    def _log_unsaved(batch: List[Dict[str, Any]]):
+        """Данные несохраненных регистраций пишутся в лог целиком, чтобы их можно было восстановить вручную"""
+        for user_data in batch:
+            logger.error("Регистрация не сохранена: %r", user_data)
+
+    def _query_admin_stats(self) -> tuple:
+        """Сводная статистика одним запросом"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(ADMIN_STATS_QUERY).fetchone()
+        finally:
+            conn.close()
+    
+    async def get_admin_stats(self) -> tuple:
+        """Статистика для /admin с коротким TTL-кэшем"""
+        async with self._admin_stats_lock:
+            cached = self._admin_stats_cache
+            now = time.monotonic()
+            if cached is not None and now - cached[0] < ADMIN_STATS_TTL:
+                return cached[1]
+            
+            stats = await asyncio.to_thread(self._query_admin_stats)
+            self._admin_stats_cache = (time.monotonic(), stats)
+            return stats
 
 # Создаем экземпляр бота
 bot_instance = EnglishClubBot()
 
+def preload_documents() -> Dict[str, bytes]:
+    """Загрузка документов для отправки в память (отсутствующие файлы пропускаются)"""
+    documents = {}
+    for path in (FILES['snaop'], FILES['newsletter_consent']):
+        try:
+            documents[path] = Path(path).read_bytes()
+        except OSError:
+            logger.warning("Документ %s не найден, он не будет отправляться", path)
+    return documents
+
+# Содержимое документов: путь -> байты (читается один раз при запуске)
+DOCUMENTS = preload_documents()
+
+# file_id уже загруженных в Telegram документов: путь -> file_id
+document_file_ids: Dict[str, str] = {}
+
+async def reply_with_document(message, path: str, **kwargs):
+    """Отправка документа: после первой загрузки переиспользуется file_id с серверов Telegram"""
+    file_id = document_file_ids.get(path)
+    if file_id is not None:
+        return await message.reply_document(document=file_id, **kwargs)
+    
+    sent_message = await message.reply_document(
+        document=DOCUMENTS[path],
+        filename=os.path.basename(path),
+        **kwargs
+    )
+    document_file_ids[path] = sent_message.document.file_id
+    return sent_message
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Начало диалога - приветствие и запрос имени"""
+    user_data = context.user_data
     user = update.effective_user
     
     # Сохраняем базовую информацию о пользователе
-    context.user_data['telegram_id'] = user.id
-    context.user_data['username'] = user.username
-    
-    # Создаем клавиатуру для согласия на обработку данных
-    keyboard = [
-        [InlineKeyboardButton(BUTTONS['data_consent']['yes'], callback_data="data_consent_yes")],
-        [InlineKeyboardButton(BUTTONS['data_consent']['no'], callback_data="data_consent_no")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    user_data['telegram_id'] = user.id
+    user_data['username'] = user.username
     
     welcome_text = DIALOG_TEXTS['welcome']['full_text']
     
     await update.message.reply_text(
         welcome_text,
-        parse_mode='HTML',
-        reply_markup=reply_markup
+        parse_mode=ParseMode.HTML,
+        reply_markup=DATA_CONSENT_MARKUP
     )
     
     return WAITING_NAME
@@ -148,7 +470,7 @@ async def handle_data_consent(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         await query.edit_message_text(
             DIALOG_TEXTS['data_consent']['approved'],
-            parse_mode='HTML'
+            parse_mode=ParseMode.HTML
         )
         
         return WAITING_NAME
@@ -160,29 +482,20 @@ async def handle_data_consent(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 async def get_name(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Получение имени и переход к вопросу об опыте"""
-    if not context.user_data.get('data_consent'):
+    user_data = context.user_data
+    if not user_data.get('data_consent'):
         await update.message.reply_text(
             "Пожалуйста, сначала дай согласие на обработку данных, нажав /start"
         )
         return ConversationHandler.END
     
     name = update.message.text.strip()
-    context.user_data['name'] = name
-    
-    # Создаем клавиатуру для вопроса об опыте
-    keyboard = [
-        [KeyboardButton(BUTTONS['experience']['yes'])],
-        [KeyboardButton(BUTTONS['experience']['no'])]
-    ]
-    reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
-    
-    greeting_text = DIALOG_TEXTS['name_received']['greeting'].format(name=name)
-    question_text = DIALOG_TEXTS['name_received']['question']
+    user_data['name'] = name
     
     await update.message.reply_text(
-        f"{greeting_text}\n\n{question_text}",
-        parse_mode='HTML',
-        reply_markup=reply_markup
+        NAME_RECEIVED_TEMPLATE.format(name=name),
+        parse_mode=ParseMode.HTML,
+        reply_markup=EXPERIENCE_MARKUP
     )
     
     return WAITING_EXPERIENCE
@@ -191,16 +504,15 @@ async def get_experience(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     """Получение информации об опыте и переход к вопросу о возрасте"""
     experience = update.message.text.strip()
     
-    if "да" in experience.lower() or "✅" in experience:
-        context.user_data['english_experience'] = "Да"
-        response = DIALOG_TEXTS['experience']['yes_response']
-    else:
-        context.user_data['english_experience'] = "Нет"
-        response = DIALOG_TEXTS['experience']['no_response']
+    reply = EXPERIENCE_REPLIES.get(experience)
+    if reply is None:
+        # Ответ введен вручную, а не кнопкой
+        reply = EXPERIENCE_YES if "да" in experience.lower() or "✅" in experience else EXPERIENCE_NO
+    
+    context.user_data['english_experience'], response_text = reply
     
     await update.message.reply_text(
-        f"{response}\n\n"
-        f"{DIALOG_TEXTS['age']['question']}",
+        response_text,
         reply_markup=None  # Убираем клавиатуру
     )
     
@@ -208,106 +520,93 @@ async def get_experience(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def get_age(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Получение возраста и переход к финальному согласию"""
-    try:
-        age = int(update.message.text.strip())
-        min_age = SETTINGS['age_limits']['min']
-        max_age = SETTINGS['age_limits']['max']
-        
-        if age < min_age or age > max_age:
-            await update.message.reply_text(
-                DIALOG_TEXTS['age']['invalid_age'].format(min_age=min_age, max_age=max_age)
-            )
-            return WAITING_AGE
-        
-        context.user_data['age'] = age
-        
-        # Создаем клавиатуру для финального согласия
-        keyboard = [
-            [InlineKeyboardButton(BUTTONS['newsletter']['yes'], callback_data="newsletter_yes")],
-            [InlineKeyboardButton(BUTTONS['newsletter']['no'], callback_data="newsletter_no")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        # Отправляем СНАОП вместе с вопросом (если файл существует)
-        snaop_file = FILES['snaop']
-        if os.path.exists(snaop_file):
-            await update.message.reply_document(
-                document=open(snaop_file, 'rb'),
-                caption=(
-                    f"{DIALOG_TEXTS['notifications']['final_greeting'].format(name=context.user_data['name'])}\n\n"
-                    f"{DIALOG_TEXTS['notifications']['info']}\n\n"
-                    f"📄 <b>Согласие на обработку персональных данных</b>"
-                ),
-                parse_mode='HTML',
-                reply_markup=reply_markup
-            )
-        else:
-            await update.message.reply_text(
-                f"{DIALOG_TEXTS['notifications']['final_greeting'].format(name=context.user_data['name'])}\n\n"
-                f"{DIALOG_TEXTS['notifications']['info']}",
-                parse_mode='HTML',
-                reply_markup=reply_markup
-            )
-        
-        return FINAL_CONSENT
+    user_data = context.user_data
+    # Формат уже проверен фильтром AGE_INPUT - разбираем число один раз
+    age = int(update.message.text)
+    
+    if not MIN_AGE <= age <= MAX_AGE:
+        await update.message.reply_text(INVALID_AGE_TEXT)
+        return WAITING_AGE
+    
+    user_data['age'] = age
         
-    except ValueError:
+    # Отправляем СНАОП вместе с вопросом (если файл существует)
+    snaop_file = FILES['snaop']
+    if snaop_file in DOCUMENTS:
+        await reply_with_document(
+            update.message,
+            snaop_file,
+            caption=SNAOP_CAPTION_TEMPLATE.format(name=user_data['name']),
+            parse_mode=ParseMode.HTML,
+            reply_markup=NEWSLETTER_MARKUP
+        )
+    else:
         await update.message.reply_text(
-            DIALOG_TEXTS['age']['invalid_format']
+            NOTIFICATIONS_TEMPLATE.format(name=user_data['name']),
+            parse_mode=ParseMode.HTML,
+            reply_markup=NEWSLETTER_MARKUP
         )
-        return WAITING_AGE
+        
+    return FINAL_CONSENT
+
+async def invalid_age_format(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Ответ на нечисловой ввод возраста"""
+    await update.message.reply_text(
+        DIALOG_TEXTS['age']['invalid_format']
+    )
+    return WAITING_AGE
 
 async def final_consent(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработка финального согласия и завершение регистрации"""
+    user_data = context.user_data
     query = update.callback_query
     await query.answer()
     
-    if query.data == "newsletter_yes":
-        context.user_data['newsletter_consent'] = True
-        consent_text = DIALOG_TEXTS['newsletter']['yes_response']
-    else:
-        context.user_data['newsletter_consent'] = False
-        consent_text = DIALOG_TEXTS['newsletter']['no_response']
-    
-    # Сохраняем все данные в БД
-    bot_instance.save_user_data(context.user_data)
-    
-    # Отправляем согласие на рассылку (если файл существует и пользователь согласился)
-    consent_file = FILES['newsletter_consent']
-    if os.path.exists(consent_file) and context.user_data.get('newsletter_consent'):
-        await query.message.reply_document(
-            document=open(consent_file, 'rb'),
-            caption="📄 Согласие на получение рассылки"
-        )
-    
-    newsletter_status = '✅' if context.user_data.get('newsletter_consent') else '❌'
+    newsletter_consent, consent_text, newsletter_status = NEWSLETTER_REPLIES.get(
+        query.data, NEWSLETTER_DECLINED
+    )
+    user_data['newsletter_consent'] = newsletter_consent
     
-    summary = DIALOG_TEXTS['registration_complete']['summary_template'].format(
-        name=context.user_data['name'],
-        age=context.user_data['age'],
-        experience=context.user_data['english_experience'],
+    summary = REGISTRATION_SUMMARY_TEMPLATE.format(
+        name=user_data['name'],
+        age=user_data['age'],
+        experience=user_data['english_experience'],
         newsletter_status=newsletter_status
     )
     
-    final_message = (
-        f"{consent_text}\n\n"
-        f"{DIALOG_TEXTS['registration_complete']['title']}\n\n"
-        f"{DIALOG_TEXTS['registration_complete']['summary_title']}\n"
-        f"{summary}\n\n"
-        f"{DIALOG_TEXTS['registration_complete']['welcome']}\n"
-        f"{DIALOG_TEXTS['registration_complete']['next_steps']}"
-    )
+    final_message = "".join((
+        consent_text,
+        REGISTRATION_COMPLETE_HEAD,
+        summary,
+        REGISTRATION_COMPLETE_TAIL
+    ))
     
-    await query.edit_message_text(
-        final_message,
-        parse_mode='HTML'
-    )
+    await save_and_send(query, user_data, final_message)
     
     # Очищаем данные пользователя
-    context.user_data.clear()
+    user_data.clear()
     
     return ConversationHandler.END
 
+async def save_and_send(query, user_data: Dict[str, Any], final_message: str) -> None:
+    """Завершающий шаг регистрации: сохранение данных и отправка сообщений за один проход"""
+    # Сохраняем все данные в БД (пакетной записью в фоне)
+    await bot_instance.queue_user_data(user_data)
+    
+    sends = [query.edit_message_text(final_message, parse_mode=ParseMode.HTML)]
+    
+    # Согласие на рассылку (если файл существует и пользователь согласился)
+    consent_file = FILES['newsletter_consent']
+    if user_data['newsletter_consent'] and consent_file in DOCUMENTS:
+        sends.append(reply_with_document(
+            query.message,
+            consent_file,
+            caption="📄 Согласие на получение рассылки"
+        ))
+    
+    # Редактирование и документ не зависят друг от друга - отправляем одновременно
+    await asyncio.gather(*sends)
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Отмена диалога"""
     await update.message.reply_text(
@@ -321,28 +620,32 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     """Обработка команды /help"""
     await update.message.reply_text(
         DIALOG_TEXTS['help']['user_commands'],
-        parse_mode='HTML'
+        parse_mode=ParseMode.HTML
     )
 
 async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработка команды /menu"""
     await bot_instance.user_interface.show_user_menu(update, context)
 
+class FakeCallbackQuery:
+    """Заглушка callback_query для вызова обработчиков меню из команд"""
+    __slots__ = ('from_user', 'message')
+    
+    def __init__(self, user, message):
+        self.from_user = user
+        self.message = message
+    
+    async def answer(self, *args, **kwargs):
+        pass
+    
+    async def edit_message_text(self, text, **kwargs):
+        await self.message.reply_text(text, **kwargs)
+
 async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработка команды /profile"""
-    # Создаем факе callback_query для совместимости
-    class FakeCallbackQuery:
-        def __init__(self, user, message):
-            self.from_user = user
-            self.message = message
-        async def answer(self): pass
-        async def edit_message_text(self, text, **kwargs):
-            await self.message.reply_text(text, **kwargs)
-    
+    # Update неизменяем - заглушка callback_query передается в обработчик напрямую
     fake_query = FakeCallbackQuery(update.effective_user, update.message)
-    update.callback_query = fake_query
-    
-    await bot_instance.user_interface.show_user_profile(update, context)
+    await bot_instance.user_interface.send_user_profile(fake_query)
 
 # Обработчики для менеджеров
 async def manager_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -370,81 +673,55 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
     )
 
 # Обработчики callback данных
+
 async def handle_user_callbacks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработка callback'ов пользовательского интерфейса"""
     query = update.callback_query
     data = query.data
     
-    if data == "user_menu":
-        await bot_instance.user_interface.show_user_menu(update, context)
-    elif data == "user_profile":
-        await bot_instance.user_interface.show_user_profile(update, context)
-    elif data == "user_help":
-        await bot_instance.user_interface.show_user_help(update, context)
-    elif data == "user_settings":
-        await bot_instance.user_interface.show_user_settings(update, context)
-    elif data.startswith("user_toggle_newsletter_"):
-        await bot_instance.user_interface.toggle_newsletter(update, context)
-    elif data == "user_delete_confirm":
-        await bot_instance.user_interface.confirm_delete_account(update, context)
-    elif data == "user_delete_confirmed":
-        await bot_instance.user_interface.delete_user_account(update, context)
-    elif data == "user_support":
-        await bot_instance.user_interface.show_support_info(update, context)
-    elif data == "user_materials":
-        await bot_instance.user_interface.show_materials(update, context)
+    handler = bot_instance.user_callback_handlers.get(data)
+    if handler is not None:
+        await handler(update, context)
+    else:
+        # Кнопки без обработчика: снимаем "часики" у клиента
+        await query.answer()
+
+# mgr_users или mgr_users_page_<номер страницы>_<n|p>_<telegram_id>_<registration_date>
+# (кнопки старого формата без ключа строки открывают первую страницу)
+MANAGER_USERS_CALLBACK_RE = re.compile(
+    r"^mgr_users(?:_page_(?P<page>\d+)"
+    r"(?:_(?P<direction>[np])_(?P<telegram_id>-?\d+)_(?P<registration_date>.+))?)?$"
+)
+
+async def handle_manager_users_page(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Страницы списка пользователей (маршрутизируются напрямую по шаблону обработчика)"""
+    match = context.matches[0]
+    cursor = None
+    if match.group('direction'):
+        cursor = (match.group('direction'), match.group('registration_date'), int(match.group('telegram_id')))
+    await bot_instance.manager_interface.show_users_list(update, context, int(match.group('page') or 1), cursor)
 
 async def handle_manager_callbacks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработка callback'ов менеджерского интерфейса"""
     query = update.callback_query
     data = query.data
     
-    if data == "mgr_menu":
-        await bot_instance.manager_interface.show_manager_menu(update, context)
-    elif data == "mgr_stats":
-        await bot_instance.manager_interface.show_detailed_stats(update, context)
-    elif data == "mgr_users" or data.startswith("mgr_users_page_"):
-        page = 1
-        if data.startswith("mgr_users_page_"):
-            page = int(data.split("_")[-1])
-        await bot_instance.manager_interface.show_users_list(update, context, page)
-    elif data == "mgr_export":
-        await bot_instance.manager_interface.export_users_data(update, context)
-    elif data == "mgr_broadcast":
-        await bot_instance.manager_interface.start_broadcast(update, context)
-    elif data == "mgr_broadcast_confirm":
-        await bot_instance.manager_interface.confirm_broadcast(update, context)
-    elif data == "mgr_broadcast_cancel":
-        await bot_instance.manager_interface.cancel_broadcast(update, context)
-    elif data == "mgr_settings":
-        await bot_instance.manager_interface.show_bot_settings(update, context)
-    elif data == "mgr_logout":
-        await bot_instance.manager_interface.logout(update, context)
-    elif data == "mgr_clear":
-        await clear_manager_data(query)
-    elif data == "confirm_clear":
-        await confirm_clear_data(query)
-    elif data == "manager_cancel":
-        await manager_cancel(query)
+    handler = bot_instance.manager_callback_handlers.get(data)
+    if handler is not None:
+        await handler(update, context)
+    else:
+        # Устаревшие обработчики не отвечают на callback сами - отвечаем сразу
+        await query.answer()
+        if data == "mgr_clear":
+            await clear_manager_data(query)
+        elif data == "confirm_clear":
+            await confirm_clear_data(query)
+        elif data == "manager_cancel":
+            await manager_cancel(query)
 
 async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Простая статистика для администратора"""
-    conn = sqlite3.connect(bot_instance.db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM users")
-    total_users = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE newsletter_consent = 1")
-    newsletter_users = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE english_experience = 'Да'")
-    experienced_users = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT AVG(age) FROM users WHERE age IS NOT NULL")
-    avg_age = cursor.fetchone()[0]
-    
-    conn.close()
+    total_users, newsletter_users, experienced_users, avg_age = await bot_instance.get_admin_stats()
     
     stats_text = (
         f"📊 <b>Статистика английского клуба:</b>\n\n"
@@ -457,7 +734,7 @@ async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     if avg_age:
         stats_text += f"\n🎂 Средний возраст: {avg_age:.1f} лет"
     
-    await update.message.reply_text(stats_text, parse_mode='HTML')
+    await update.message.reply_text(stats_text, parse_mode=ParseMode.HTML)
 
 # Устаревшие обработчики (оставляем для совместимости)
 async def manager_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -468,129 +745,15 @@ async def handle_manager_callback(update: Update, context: ContextTypes.DEFAULT_
     """Обработка callback'ов менеджерского меню - перенаправляем на новый интерфейс"""
     await handle_manager_callbacks(update, context)
 
-async def show_manager_stats(query) -> None:
-    """Показать детальную статистику"""
-    conn = sqlite3.connect(bot_instance.db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM users")
-    total_users = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE newsletter_consent = 1")
-    newsletter_users = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE english_experience = 'Да'")
-    experienced_users = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT AVG(age) FROM users WHERE age IS NOT NULL")
-    avg_age = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE registration_date >= date('now', '-7 days')")
-    new_week = cursor.fetchone()[0]
-    
-    conn.close()
-    
-    stats_text = (
-        f"📊 <b>Детальная статистика:</b>\n\n"
-        f"👥 Всего участников: {total_users}\n"
-        f"📧 Подписаны на рассылку: {newsletter_users}\n"
-        f"📚 С опытом изучения: {experienced_users}\n"
-        f"🆕 Новички: {total_users - experienced_users}\n"
-        f"📅 Новые за неделю: {new_week}"
-    )
-    
-    if avg_age:
-        stats_text += f"\n🎂 Средний возраст: {avg_age:.1f} лет"
-    
-    await query.edit_message_text(stats_text, parse_mode='HTML')
-
-async def show_manager_users(query) -> None:
-    """Показать список пользователей"""
-    conn = sqlite3.connect(bot_instance.db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT name, age, english_experience, newsletter_consent, registration_date
-        FROM users ORDER BY registration_date DESC LIMIT 10
-    ''')
-    
-    users = cursor.fetchall()
-    conn.close()
-    
-    if not users:
-        await query.edit_message_text("📭 Пользователи не найдены")
-        return
-    
-    users_text = "👥 <b>Последние 10 пользователей:</b>\n\n"
-    
-    for user in users:
-        name, age, experience, newsletter, reg_date = user
-        newsletter_status = "✅" if newsletter else "❌"
-        users_text += f"👤 <b>{name}</b>, {age} лет\n"
-        users_text += f"   📚 Опыт: {experience}\n"
-        users_text += f"   📧 Рассылка: {newsletter_status}\n"
-        users_text += f"   📅 {reg_date}\n\n"
-    
-    await query.edit_message_text(users_text, parse_mode='HTML')
-
-async def export_manager_data(query) -> None:
-    """Экспорт данных пользователей"""
-    conn = sqlite3.connect(bot_instance.db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT telegram_id, username, name, age, english_experience, 
-               data_consent, newsletter_consent, registration_date
-        FROM users ORDER BY registration_date DESC
-    ''')
-    
-    users = cursor.fetchall()
-    conn.close()
-    
-    if not users:
-        await query.edit_message_text("📭 Нет пользователей для экспорта")
-        return
-    
-    filename = f"users_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow([
-            'Telegram ID', 'Username', 'Имя', 'Возраст', 'Опыт изучения',
-            'Согласие на данные', 'Согласие на рассылку', 'Дата регистрации'
-        ])
-        
-        for user in users:
-            writer.writerow(user)
-    
-    await query.edit_message_text(
-        f"✅ <b>Данные экспортированы!</b>\n\n"
-        f"📁 Файл: {filename}\n"
-        f"📊 Пользователей: {len(users)}",
-        parse_mode='HTML'
-    )
-    
-    # Отправляем файл
-    await query.message.reply_document(
-        document=open(filename, 'rb'),
-        caption=f"📊 Экспорт пользователей ({len(users)} записей)"
-    )
-
 async def clear_manager_data(query) -> None:
     """Запрос подтверждения на очистку БД"""
-    keyboard = [
-        [InlineKeyboardButton("✅ Да, удалить все", callback_data="confirm_clear")],
-        [InlineKeyboardButton("❌ Отмена", callback_data="manager_cancel")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     await query.edit_message_text(
         "⚠️ <b>ВНИМАНИЕ!</b>\n\n"
         "Вы собираетесь удалить ВСЕ данные пользователей из базы данных.\n"
         "Это действие нельзя отменить!\n\n"
         "Продолжить?",
-        parse_mode='HTML',
-        reply_markup=reply_markup
+        parse_mode=ParseMode.HTML,
+        reply_markup=CLEAR_CONFIRM_MARKUP
     )
 
 async def confirm_clear_data(query) -> None:
@@ -600,17 +763,27 @@ async def confirm_clear_data(query) -> None:
     cursor.execute("DELETE FROM users")
     conn.commit()
     conn.close()
+    bot_instance.manager_interface.invalidate_stats_cache()
     
     await query.edit_message_text(
         "✅ <b>База данных очищена!</b>\n\n"
         "Все данные пользователей удалены.",
-        parse_mode='HTML'
+        parse_mode=ParseMode.HTML
     )
 
 async def manager_cancel(query) -> None:
     """Отмена операции"""
     await query.edit_message_text("❌ Операция отменена")
 
+async def post_init(application: Application) -> None:
+    """Запуск фоновых задач после инициализации приложения"""
+    bot_instance.start_registration_writer()
+
+async def post_shutdown(application: Application) -> None:
+    """Дописываем оставшиеся регистрации перед выходом"""
+    await bot_instance.stop_registration_writer()
+    bot_instance.manager_interface.close()
+
 def main() -> None:
     """Главная функция запуска бота"""
     if BOT_TOKEN == 'YOUR_BOT_TOKEN_HERE':
@@ -619,7 +792,13 @@ def main() -> None:
         return
     
     # Создаем приложение
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     
     # Создаем обработчик диалога
     conv_handler = ConversationHandler(
@@ -627,13 +806,14 @@ def main() -> None:
         states={
             WAITING_NAME: [
                 CallbackQueryHandler(handle_data_consent, pattern="^data_consent_"),
-                MessageHandler(filters.TEXT & ~filters.COMMAND, get_name)
+                MessageHandler(TEXT_INPUT, get_name)
             ],
             WAITING_EXPERIENCE: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, get_experience)
+                MessageHandler(TEXT_INPUT, get_experience)
             ],
             WAITING_AGE: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, get_age)
+                MessageHandler(AGE_INPUT, get_age),
+                MessageHandler(TEXT_INPUT, invalid_age_format)
             ],
             FINAL_CONSENT: [
                 CallbackQueryHandler(final_consent, pattern="^newsletter_")
@@ -642,29 +822,33 @@ def main() -> None:
         fallbacks=[CommandHandler('cancel', cancel)],
     )
     
-    # Добавляем обработчики
-    application.add_handler(conv_handler)
-    
-    # Пользовательские команды
-    application.add_handler(CommandHandler('help', help_command))
-    application.add_handler(CommandHandler('menu', menu_command))
-    application.add_handler(CommandHandler('profile', profile_command))
-    
-    # Менеджерские команды
-    application.add_handler(CommandHandler('admin', admin_stats))
-    application.add_handler(CommandHandler('manager', manager_command))
-    
-    # Обработчики callback'ов
-    application.add_handler(CallbackQueryHandler(handle_user_callbacks, pattern="^user_"))
-    application.add_handler(CallbackQueryHandler(handle_manager_callbacks, pattern="^mgr_"))
-    
-    # Старые обработчики для совместимости
-    application.add_handler(CallbackQueryHandler(handle_manager_callback, pattern="^manager_"))
-    application.add_handler(CallbackQueryHandler(confirm_clear_data, pattern="^confirm_clear$"))
-    application.add_handler(CallbackQueryHandler(manager_cancel, pattern="^manager_cancel$"))
-    
-    # Обработчик текстовых сообщений
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_messages))
+    # Добавляем все обработчики одним вызовом (порядок важен)
+    application.add_handlers([
+        conv_handler,
+        
+        # Пользовательские команды
+        CommandHandler('help', help_command),
+        CommandHandler('menu', menu_command),
+        CommandHandler('profile', profile_command),
+        
+        # Менеджерские команды
+        CommandHandler('admin', admin_stats),
+        CommandHandler('manager', manager_command),
+        
+        # Обработчики callback'ов (префиксные маршруты - до общих, чтобы не проходить через диспетчер)
+        CallbackQueryHandler(bot_instance.user_interface.toggle_newsletter, pattern="^user_toggle_newsletter_"),
+        CallbackQueryHandler(handle_manager_users_page, pattern=MANAGER_USERS_CALLBACK_RE),
+        CallbackQueryHandler(handle_user_callbacks, pattern="^user_"),
+        CallbackQueryHandler(handle_manager_callbacks, pattern="^mgr_"),
+        
+        # Старые обработчики для совместимости
+        CallbackQueryHandler(handle_manager_callback, pattern="^manager_"),
+        CallbackQueryHandler(confirm_clear_data, pattern="^confirm_clear$"),
+        CallbackQueryHandler(manager_cancel, pattern="^manager_cancel$"),
+        
+        # Обработчик текстовых сообщений
+        MessageHandler(TEXT_INPUT, handle_text_messages),
+    ])
     
     # Запускаем бота
     logger.info("🤖 Бот запущен! Нажмите Ctrl+C для остановки.")
@@ -673,7 +857,7 @@ def main() -> None:
     # Очищаем истекшие сессии при запуске
     expired_count = auth_manager.cleanup_expired_sessions()
     if expired_count > 0:
-        logger.info(f"Очищено {expired_count} истекших сессий")
+        logger.info("Очищено %d истекших сессий", expired_count)
     
     application.run_polling()
 
@@ -248,7 +248,8 @@ SETTINGS = {
 # Файлы документов
 FILES = {
     'snaop': "СнаОП с прочерками.pdf",
-    'newsletter_consent': "Согласие_на_рассылку_информационных_и_рекламных_сообщений_с_прочерками.pdf"
+    'newsletter_consent': "Согласие_на_рассылку_информационных_и_рекламных_сообщений_с_прочерками.pdf",
+    'users_export': "users_export_%Y%m%d_%H%M%S.csv"  # шаблон strftime для имени файла экспорта
 }
 
 # Callback data patterns
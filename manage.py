@@ -7,72 +7,172 @@
 import sqlite3
 import os
 import sys
-from datetime import datetime
-import csv
+
+# json, csv, gzip и datetime импортируются внутри команд, которым они нужны:
+# init и clear, часто вызываемые из скриптов, не тратят время на их загрузку
 
 DATABASE_PATH = 'english_club.db'
 
-def init_db():
-    """Инициализация базы данных"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+# Файл с последним результатом статистики (рядом с БД)
+STATS_CACHE_PATH = os.path.splitext(DATABASE_PATH)[0] + '.stats_cache.json'
+
+# Максимальный объем БД, отображаемый в память при чтении (байт)
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Сколько последних пользователей выводит команда users
+USERS_LIST_LIMIT = 20
+
+# Размер пачки строк при выгрузке в CSV
+EXPORT_CHUNK_SIZE = 10000
+
+# Шаблоны имен файлов выгрузки и дампа (формат strftime)
+EXPORT_FILENAME_TEMPLATE = 'users_export_%Y%m%d_%H%M%S.csv'
+DUMP_FILENAME_TEMPLATE = 'english_club_dump_%Y%m%d_%H%M%S.sql.gz'
+
+# Буфер записи файла выгрузки (байт): данные уходят на диск крупными блоками
+EXPORT_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Версия схемы, записываемая в PRAGMA user_version после создания таблиц
+SCHEMA_VERSION = 2
+
+# Схема БД: таблица пользователей и индексы
+SCHEMA_SQL = f"""
+    BEGIN;
     
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            telegram_id INTEGER UNIQUE NOT NULL,
-            username TEXT,
-            name TEXT NOT NULL,
-            age INTEGER,
-            english_experience TEXT,
-            data_consent BOOLEAN DEFAULT 0,
-            newsletter_consent BOOLEAN DEFAULT 0,
-            registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        telegram_id INTEGER UNIQUE NOT NULL,
+        username TEXT,
+        name TEXT NOT NULL,
+        age INTEGER,
+        english_experience TEXT,
+        data_consent BOOLEAN DEFAULT 0,
+        newsletter_consent BOOLEAN DEFAULT 0,
+        registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
     
-    conn.commit()
-    conn.close()
-    print("✅ База данных инициализирована")
+    -- Сортировка списков и выгрузки по дате регистрации идет по индексу, без отдельной сортировки;
+    -- telegram_id - для постраничного списка менеджера по ключу (registration_date, telegram_id)
+    DROP INDEX IF EXISTS idx_users_registration_date;
+    CREATE INDEX IF NOT EXISTS idx_users_registration_keyset
+    ON users(registration_date DESC, telegram_id DESC);
+    
+    -- Частичный индекс только по подписчикам рассылки
+    CREATE INDEX IF NOT EXISTS idx_users_newsletter
+    ON users(newsletter_consent) WHERE newsletter_consent = 1;
+    
+    PRAGMA user_version = {SCHEMA_VERSION};
+    
+    COMMIT;
+"""
 
-def show_stats():
-    """Показать статистику"""
-    if not os.path.exists(DATABASE_PATH):
-        print("❌ База данных не найдена. Запустите сначала бота.")
+# Ключи статистики в выводе --json (в порядке колонок STATS_QUERY)
+STATS_JSON_KEYS = ('total', 'newsletter', 'experienced', 'beginners', 'avg_age')
+
+# Поддерживаемые флаги командной строки
+KNOWN_OPTIONS = ('--json', '--quiet', '--stdout')
+
+# Ответ "есть опыт изучения" в колонке english_experience
+EXPERIENCE_YES = 'Да'
+
+# Все показатели статистики за один проход по таблице
+# (текст запроса неизменен, значение передается параметром - sqlite3 берет готовый план из кэша)
+STATS_QUERY = """
+    SELECT COUNT(*),
+           COALESCE(SUM(newsletter_consent = 1), 0),
+           COALESCE(SUM(english_experience = :experience_yes), 0),
+           COUNT(*) - COALESCE(SUM(english_experience = :experience_yes), 0),
+           AVG(age)
+    FROM users
+"""
+
+def _report(options: frozenset, message: str):
+    """Служебное сообщение о ходе команды (подавляется флагом --quiet)"""
+    if '--quiet' not in options:
+        print(message)
+
+def _trace_sql(statement: str):
+    """Вывод выполняемых SQL-запросов в stderr (включается переменной MANAGE_DEBUG)"""
+    sys.stderr.write(statement + '\n')
+
+def init_db(conn: sqlite3.Connection, options: frozenset):
+    """Инициализация базы данных"""
+    # Схема актуальна - повторный init только читает заголовок файла, без транзакции записи
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        _report(options, "✅ База данных уже инициализирована")
         return
     
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM users")
-    total = cursor.fetchone()[0]
+    # Вся схема одним скриптом: один разбор вместо отдельного execute на каждую команду
+    conn.executescript(SCHEMA_SQL)
+    _report(options, "✅ База данных инициализирована")
+
+def show_stats(conn: sqlite3.Connection, options: frozenset):
+    """Показать статистику"""
+    import json
     
-    cursor.execute("SELECT COUNT(*) FROM users WHERE newsletter_consent = 1")
-    newsletter = cursor.fetchone()[0]
+    stats = _load_stats(conn)
     
-    cursor.execute("SELECT COUNT(*) FROM users WHERE english_experience = 'Да'")
-    experienced = cursor.fetchone()[0]
+    # Для скриптов мониторинга: одна строка JSON без эмодзи и форматирования
+    if '--json' in options:
+        json.dump(dict(zip(STATS_JSON_KEYS, stats)), sys.stdout)
+        sys.stdout.write('\n')
+        return
     
-    cursor.execute("SELECT AVG(age) FROM users WHERE age IS NOT NULL")
-    avg_age = cursor.fetchone()[0]
+    total, newsletter, experienced, beginners, avg_age = stats
     
     print(f"\n📊 Статистика английского клуба:")
     print(f"👥 Всего участников: {total}")
     print(f"📧 Подписаны на рассылку: {newsletter}")
     print(f"📚 С опытом изучения: {experienced}")
-    print(f"🆕 Новички: {total - experienced}")
+    print(f"🆕 Новички: {beginners}")
     if avg_age:
         print(f"🎂 Средний возраст: {avg_age:.1f} лет")
+
+def _db_signature():
+    """Время изменения и размер файла БД и WAL-журнала (меняются при любой записи)"""
+    st = os.stat(DATABASE_PATH)
+    try:
+        wal = os.stat(DATABASE_PATH + '-wal')
+    except OSError:
+        wal = None
+    # Пустой WAL (создается при каждом открытии БД) не содержит данных и в ключ не входит.
+    # После чекпоинта WAL перезаписывается с начала и его размер не растет,
+    # поэтому у непустого журнала учитывается и время изменения
+    if wal is None or wal.st_size == 0:
+        wal_signature = [0, 0]
+    else:
+        wal_signature = [wal.st_mtime_ns, wal.st_size]
+    return [st.st_mtime_ns, st.st_size, *wal_signature]
+
+def _load_stats(conn: sqlite3.Connection):
+    """Статистика из кэша, если БД не менялась; иначе - запрос и обновление кэша"""
+    import json
+    
+    signature = _db_signature()
+    try:
+        with open(STATS_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        # Текст запроса входит в ключ: после изменения запроса старый кэш не подходит
+        if cache['signature'] == signature and cache['query'] == STATS_QUERY:
+            return cache['stats']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
     
-    conn.close()
+    stats = conn.execute(STATS_QUERY, {'experience_yes': EXPERIENCE_YES}).fetchone()
+    
+    # Сохраняем, только если во время запроса в БД никто не писал
+    if _db_signature() == signature:
+        try:
+            with open(STATS_CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump({'signature': signature, 'query': STATS_QUERY, 'stats': stats}, f)
+        except OSError:
+            pass
+    return stats
 
-def export_users():
+def export_users(conn: sqlite3.Connection, options: frozenset):
     """Экспорт пользователей в CSV"""
-    if not os.path.exists(DATABASE_PATH):
-        print("❌ База данных не найдена")
-        return
+    from datetime import datetime
     
-    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -81,77 +181,112 @@ def export_users():
         FROM users ORDER BY registration_date DESC
     ''')
     
-    users = cursor.fetchall()
-    conn.close()
+    # Потоковая выгрузка в stdout (например, manage.py export --stdout | gzip > users.csv.gz):
+    # без файла на диске, stdout содержит только CSV
+    if '--stdout' in options:
+        sys.stdout.reconfigure(newline='', encoding='utf-8')
+        _write_users_csv(sys.stdout, cursor, cursor.fetchmany(EXPORT_CHUNK_SIZE))
+        return
     
-    if not users:
-        print("📭 Нет пользователей для экспорта")
+    # Строки читаются из курсора пачками и сразу пишутся в файл
+    chunk = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+    if not chunk:
+        _report(options, "📭 Нет пользователей для экспорта")
         return
     
-    filename = f"users_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filename = datetime.now().strftime(EXPORT_FILENAME_TEMPLATE)
     
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow([
-            'Telegram ID', 'Username', 'Имя', 'Возраст', 'Опыт изучения',
-            'Согласие на данные', 'Согласие на рассылку', 'Дата регистрации'
-        ])
-        
-        for user in users:
-            writer.writerow(user)
+    with open(filename, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as csvfile:
+        exported_count = _write_users_csv(csvfile, cursor, chunk)
     
-    print(f"✅ Данные экспортированы в файл: {filename}")
-    print(f"📊 Экспортировано пользователей: {len(users)}")
+    _report(options, f"✅ Данные экспортированы в файл: {filename}")
+    _report(options, f"📊 Экспортировано пользователей: {exported_count}")
 
-def clear_db():
-    """Очистка базы данных"""
-    if not os.path.exists(DATABASE_PATH):
-        print("❌ База данных не найдена")
-        return
+def _write_users_csv(output, cursor: sqlite3.Cursor, chunk: list) -> int:
+    """Запись заголовка и всех строк курсора (начиная с уже прочитанной пачки), возвращает число строк"""
+    import csv
+    
+    writer = csv.writer(output)
+    writer.writerow([
+        'Telegram ID', 'Username', 'Имя', 'Возраст', 'Опыт изучения',
+        'Согласие на данные', 'Согласие на рассылку', 'Дата регистрации'
+    ])
+    
+    exported_count = 0
+    while chunk:
+        writer.writerows(chunk)
+        exported_count += len(chunk)
+        chunk = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+    return exported_count
+
+def export_sql(conn: sqlite3.Connection, options: frozenset):
+    """Полный дамп БД в SQL (сжатый gzip)"""
+    import gzip
+    from datetime import datetime
+    
+    filename = datetime.now().strftime(DUMP_FILENAME_TEMPLATE)
+    
+    # Быстрое сжатие: дамп текстовый и хорошо жмется даже на минимальном уровне
+    with gzip.open(filename, 'wt', encoding='utf-8', compresslevel=1) as dump_file:
+        for line in conn.iterdump():
+            dump_file.write(line)
+            dump_file.write('\n')
     
+    _report(options, f"✅ Дамп базы данных сохранен в файл: {filename}")
+    _report(options, f"Восстановление: gunzip -c {filename} | sqlite3 новая_база.db")
+
+def clear_db(conn: sqlite3.Connection, options: frozenset):
+    """Очистка базы данных"""
     confirm = input("⚠️ Вы уверены, что хотите удалить ВСЕ данные? (да/нет): ")
     if confirm.lower() != 'да':
-        print("❌ Операция отменена")
+        _report(options, "❌ Операция отменена")
         return
     
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM users")
+    # Удаление одной явной транзакцией
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM users")
     conn.commit()
-    conn.close()
     
-    print("✅ База данных очищена")
+    _report(options, "✅ База данных очищена")
 
-def show_users():
+def show_users(conn: sqlite3.Connection, options: frozenset):
     """Показать список пользователей"""
-    if not os.path.exists(DATABASE_PATH):
-        print("❌ База данных не найдена")
-        return
-    
-    conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
         SELECT name, age, english_experience, newsletter_consent, registration_date
-        FROM users ORDER BY registration_date DESC LIMIT 20
-    ''')
-    
-    users = cursor.fetchall()
-    conn.close()
-    
-    if not users:
-        print("📭 Пользователи не найдены")
-        return
-    
-    print(f"\n👥 Последние {len(users)} пользователей:")
-    print("-" * 80)
+        FROM users ORDER BY registration_date DESC LIMIT ?
+    ''', (USERS_LIST_LIMIT,))
     
-    for user in users:
-        name, age, experience, newsletter, reg_date = user
+    # Строки печатаются прямо из курсора, без промежуточного списка
+    shown_count = 0
+    for name, age, experience, newsletter, reg_date in cursor:
+        if shown_count == 0:
+            print(f"\n👥 Последние пользователи:")
+            print("-" * 80)
+        
         newsletter_status = "✅" if newsletter else "❌"
         print(f"👤 {name}, {age} лет, опыт: {experience}, рассылка: {newsletter_status}")
         print(f"   📅 Зарегистрирован: {reg_date}")
         print("-" * 40)
+        shown_count += 1
+    
+    if shown_count == 0:
+        print("📭 Пользователи не найдены")
+        return
+    
+    print(f"Показано пользователей: {shown_count}")
+
+# Команды утилиты (словарь собирается один раз при импорте)
+COMMANDS = {
+    'init': init_db,
+    'stats': show_stats,
+    'users': show_users,
+    'export': export_users,
+    'dump': export_sql,
+    'clear': clear_db
+}
 
 def main():
     """Главное меню управления"""
@@ -162,25 +297,62 @@ def main():
         print("  stats    - Показать статистику")
         print("  users    - Показать список пользователей")
         print("  export   - Экспортировать пользователей в CSV")
+        print("  dump     - Сохранить полный SQL-дамп БД (.sql.gz)")
         print("  clear    - Очистить базу данных")
+        print("\nФлаги:")
+        print("  --json   - Вывести статистику (stats) одной строкой JSON")
+        print("  --quiet  - Не выводить служебные сообщения о ходе команд")
+        print("  --stdout - Выгрузить CSV (export) в stdout вместо файла")
+        print("\nПеременная окружения MANAGE_DEBUG=1 выводит SQL-запросы в stderr")
         print("\nПример: python manage.py stats")
+        print("Несколько команд подряд: python manage.py stats users")
         return
     
-    command = sys.argv[1].lower()
+    args = [arg.lower() for arg in sys.argv[1:]]
+    options = frozenset(arg for arg in args if arg.startswith('--'))
+    command_names = [arg for arg in args if not arg.startswith('--')]
     
-    commands = {
-        'init': init_db,
-        'stats': show_stats,
-        'users': show_users,
-        'export': export_users,
-        'clear': clear_db
-    }
+    for command in command_names:
+        if command not in COMMANDS:
+            print(f"❌ Неизвестная команда: {command}")
+            print("Используйте: python manage.py для списка команд")
+            return
     
-    if command in commands:
-        commands[command]()
-    else:
-        print(f"❌ Неизвестная команда: {command}")
+    for option in options:
+        if option not in KNOWN_OPTIONS:
+            print(f"❌ Неизвестный флаг: {option}")
+            print("Используйте: python manage.py для списка команд")
+            return
+    
+    if not command_names:
+        print("❌ Не указана команда")
         print("Используйте: python manage.py для списка команд")
+        return
+    
+    # Подключение к несуществующей БД создало бы пустой файл - без init не подключаемся
+    if command_names[0] != 'init' and not os.path.exists(DATABASE_PATH):
+        print("❌ База данных не найдена. Запустите сначала бота.")
+        return
+    
+    # Одно подключение на все команды: кэш страниц SQLite не сбрасывается между ними
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        if os.environ.get('MANAGE_DEBUG'):
+            conn.set_trace_callback(_trace_sql)
+        
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # Чтение страниц через отображение файла в память, без копирования в буфер SQLite
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        
+        for command in command_names:
+            COMMANDS[command](conn, options)
+        
+        # Обновляем статистику планировщика только там, где она устарела (обычно ничего не делает)
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -6,22 +6,260 @@
 
 import sqlite3
 import csv
+import io
 import os
 import asyncio
+import logging
+import threading
+import time
+from itertools import islice
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
-from telegram.error import TelegramError
-from dialog_config import MANAGER_TEXTS, BUTTONS, SETTINGS
+from telegram.error import RetryAfter
+from dialog_config import MANAGER_TEXTS, BUTTONS, SETTINGS, FILES
+from static_markup import StaticInlineKeyboardMarkup
 from auth_manager import auth_manager
 
+logger = logging.getLogger(__name__)
+
+# Общая строка возврата в меню менеджера
+BACK_TO_MANAGER_MENU_ROW = (InlineKeyboardButton(BUTTONS['manager_stats']['back'], callback_data="mgr_menu"),)
+
+# Шаблон главного меню менеджера: статическая часть подставляется один раз при импорте
+MANAGER_MENU_TEMPLATE = (
+    f"{MANAGER_TEXTS['menu']['title']}\n\n"
+    f"{MANAGER_TEXTS['menu']['description']}\n\n"
+    "⏰ Сессия истекает через: {minutes} мин {seconds} сек\n"
+    "👤 Активных сессий: {sessions}"
+)
+
+# Карточка пользователя в списке: шаблон разбирается один раз, в цикле только подстановка
+USERS_LIST_ENTRY_TEMPLATE = (
+    "👤 <b>{name}</b> ({age} лет)\n"
+    "   📚 Опыт: {english_experience}\n"
+    "   📧 Рассылка: {newsletter_mark}\n"
+    "   📅 {registration_date}\n"
+    "   🆔 ID: {telegram_id}\n\n"
+)
+
+# Отметка подписки по значению newsletter_consent
+NEWSLETTER_MARKS = ("❌", "✅")
+
+# Настройки общего подключения менеджера к БД (применяются один раз при открытии)
+MANAGER_DB_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    PRAGMA mmap_size=268435456;
+"""
+
+# Рассылка: сколько сообщений отправляется одновременно. Каждое занимает слот еще на секунду
+# после отправки, поэтому в секунду уходит не больше BROADCAST_CONCURRENCY сообщений
+# (общий лимит Telegram - около 30 сообщений в секунду)
+BROADCAST_CONCURRENCY = 25
+
+# Сколько раз сообщение отправляется повторно после ответа Telegram "слишком часто" (RetryAfter)
+BROADCAST_RETRY_ATTEMPTS = 3
+
+# Сколько получателей рассылки читается из БД за один запрос
+BROADCAST_FETCH_SIZE = 500
+
+# Выгрузка пользователей в CSV: заголовок и размер пачки строк, читаемых из курсора
+USERS_CSV_HEADER = (
+    'Telegram ID', 'Username', 'Имя', 'Возраст', 'Опыт изучения',
+    'Согласие на данные', 'Согласие на рассылку', 'Дата регистрации'
+)
+EXPORT_CHUNK_SIZE = 1000
+
+# Черновик рассылки живет BROADCAST_SESSION_TTL секунд; одновременно хранится не больше BROADCAST_SESSIONS_LIMIT
+BROADCAST_SESSION_TTL = 300
+BROADCAST_SESSIONS_LIMIT = 100
+
+# Заголовок сообщения рассылки (перед текстом менеджера)
+BROADCAST_HEADER = "📢 <b>Сообщение от английского клуба:</b>\n\n"
+
+# Время жизни кэша статистики менеджера (секунды): данные меняются на масштабе минут
+MANAGER_STATS_TTL = 30.0
+
+# Запросы менеджера - константы модуля: одинаковый текст каждый раз находит
+# уже подготовленный оператор в кэше подключения sqlite3
+MANAGER_DB_CACHED_STATEMENTS = 32
+
+USERS_COUNT_QUERY = "SELECT COUNT(*) FROM users"
+SUBSCRIBERS_COUNT_QUERY = "SELECT COUNT(*) FROM users WHERE newsletter_consent = 1"
+# Подписчики пачками по возрастанию id: следующая пачка продолжается от последнего id
+SUBSCRIBER_IDS_CHUNK_QUERY = """
+    SELECT id, telegram_id FROM users
+    WHERE newsletter_consent = 1 AND id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+USERS_EXPORT_QUERY = """
+    SELECT telegram_id, username, name, age, english_experience, 
+           data_consent, newsletter_consent, registration_date
+    FROM users ORDER BY registration_date DESC
+"""
+
+# Основные показатели детальной статистики за один проход по таблице
+DETAILED_STATS_QUERY = """
+    SELECT COUNT(*),
+           COALESCE(SUM(newsletter_consent = 1), 0),
+           COALESCE(SUM(english_experience = 'Да'), 0),
+           AVG(age),
+           COALESCE(SUM(registration_date >= date('now', '-7 days')), 0),
+           COALESCE(SUM(registration_date >= date('now', '-30 days')), 0)
+    FROM users
+"""
+
+# Возрастное распределение и регистрации по дням за неделю одним запросом: (вид, группа, количество)
+DETAILED_STATS_GROUPS_QUERY = """
+    SELECT 'age' AS kind,
+           CASE 
+               WHEN age < 18 THEN 'До 18'
+               WHEN age < 25 THEN '18-24'
+               WHEN age < 35 THEN '25-34'
+               WHEN age < 45 THEN '35-44'
+               WHEN age < 55 THEN '45-54'
+               ELSE '55+'
+           END AS grp,
+           COUNT(*)
+    FROM users
+    WHERE age IS NOT NULL
+    GROUP BY grp
+    UNION ALL
+    SELECT 'day', DATE(registration_date) AS grp, COUNT(*)
+    FROM users
+    WHERE registration_date >= date('now', '-7 days')
+    GROUP BY grp
+    ORDER BY kind, grp
+"""
+
+# Страницы списка пользователей: поиск по ключу (registration_date, telegram_id) вместо OFFSET.
+# Следующая страница - строки после последней показанной, предыдущая - строки перед первой
+USERS_PAGE_COLUMNS = """
+    SELECT telegram_id, username, name, age, english_experience, 
+           newsletter_consent, registration_date
+    FROM users
+"""
+USERS_FIRST_PAGE_QUERY = USERS_PAGE_COLUMNS + """
+    ORDER BY registration_date DESC, telegram_id DESC
+    LIMIT ?
+"""
+USERS_NEXT_PAGE_QUERY = USERS_PAGE_COLUMNS + """
+    WHERE (registration_date, telegram_id) < (?, ?)
+    ORDER BY registration_date DESC, telegram_id DESC
+    LIMIT ?
+"""
+USERS_PREV_PAGE_QUERY = USERS_PAGE_COLUMNS + """
+    WHERE (registration_date, telegram_id) > (?, ?)
+    ORDER BY registration_date ASC, telegram_id ASC
+    LIMIT ?
+"""
+
+# Неизменяемые клавиатуры экранов менеджера
+MANAGER_MENU_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton(BUTTONS['manager_menu']['stats'], callback_data="mgr_stats")],
+    [InlineKeyboardButton(BUTTONS['manager_menu']['users'], callback_data="mgr_users"),
+     InlineKeyboardButton(BUTTONS['manager_menu']['export'], callback_data="mgr_export")],
+    [InlineKeyboardButton(BUTTONS['manager_menu']['broadcast'], callback_data="mgr_broadcast")],
+    [InlineKeyboardButton(BUTTONS['manager_menu']['settings'], callback_data="mgr_settings"),
+     InlineKeyboardButton(BUTTONS['manager_menu']['clear'], callback_data="mgr_clear")],
+    [InlineKeyboardButton("🚪 Выход", callback_data="mgr_logout")]
+])
+
+# Постоянная часть клавиатуры списка пользователей (меняются только кнопки страниц)
+USERS_LIST_TOOL_ROWS = (
+    (InlineKeyboardButton("🔍 Поиск пользователя", callback_data="mgr_search_user"),),
+    (InlineKeyboardButton("📊 Статистика пользователей", callback_data="mgr_user_stats"),),
+    BACK_TO_MANAGER_MENU_ROW
+)
+
+STATS_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Экспорт статистики", callback_data="mgr_export_stats")],
+    [InlineKeyboardButton("🔄 Обновить", callback_data="mgr_stats")],
+    BACK_TO_MANAGER_MENU_ROW
+])
+
+BROADCAST_CONFIRM_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("📤 Отправить", callback_data="mgr_broadcast_confirm")],
+    [InlineKeyboardButton("❌ Отмена", callback_data="mgr_broadcast_cancel")]
+])
+
+BOT_SETTINGS_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Перезагрузить конфиг", callback_data="mgr_reload_config")],
+    [InlineKeyboardButton("🧹 Очистить сессии", callback_data="mgr_cleanup_sessions")],
+    [InlineKeyboardButton("📊 Системная информация", callback_data="mgr_system_info")],
+    BACK_TO_MANAGER_MENU_ROW
+])
+
+class BroadcastSession:
+    """Черновик рассылки, ожидающий подтверждения (слоты вместо словаря)"""
+    
+    __slots__ = ('message', 'recipients_count', 'created_at')
+    
+    def __init__(self, message: str, recipients_count: int, created_at: float):
+        self.message = message
+        self.recipients_count = recipients_count
+        self.created_at = created_at
+
 class ManagerInterface:
     """Класс для обработки интерфейса менеджера"""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.broadcast_sessions = {}  # user_id -> broadcast_data
+        self.broadcast_sessions: Dict[int, BroadcastSession] = {}  # user_id -> черновик рассылки
+        
+        # Одно подключение на все запросы менеджера (открывается при первом обращении).
+        # Запросы идут и из цикла событий, и из потоков to_thread - доступ под блокировкой
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        
+        # Кэш тяжелых показателей: ключ -> (время получения, значение)
+        self._stats_cache: Dict[str, tuple] = {}
+    
+    @contextmanager
+    def _db(self):
+        """Общее подключение к БД на время одного запроса"""
+        with self._db_lock:
+            if self._conn is None:
+                conn = sqlite3.connect(
+                    self.db_path,
+                    check_same_thread=False,
+                    isolation_level=None,
+                    cached_statements=MANAGER_DB_CACHED_STATEMENTS
+                )
+                conn.executescript(MANAGER_DB_PRAGMAS)
+                # Строки доступны и по индексу, и по имени колонки - без словаря на каждую строку
+                conn.row_factory = sqlite3.Row
+                self._conn = conn
+            yield self._conn
+    
+    def _cached(self, key: str, loader):
+        """Значение из кэша, если оно не старше MANAGER_STATS_TTL; иначе - loader() и обновление кэша"""
+        cached = self._stats_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < MANAGER_STATS_TTL:
+            return cached[1]
+        
+        value = loader()
+        self._stats_cache[key] = (now, value)
+        return value
+    
+    def invalidate_stats_cache(self) -> None:
+        """Сбросить кэш статистики (после изменения данных)"""
+        self._stats_cache.clear()
+    
+    def close(self) -> None:
+        """Закрыть общее подключение к БД"""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
     
     async def request_auth(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Запрос авторизации менеджера"""
@@ -33,7 +271,7 @@ class ManagerInterface:
         
         await update.message.reply_text(
             MANAGER_TEXTS['auth']['request_password'],
-            parse_mode='HTML'
+            parse_mode=ParseMode.HTML
         )
         
         # Устанавливаем состояние ожидания пароля
@@ -56,7 +294,7 @@ class ManagerInterface:
         if auth_manager.authenticate(user_id, password):
             await update.message.reply_text(
                 MANAGER_TEXTS['auth']['access_granted'],
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
             context.user_data['awaiting_manager_password'] = False
             await self.show_manager_menu(update, context)
@@ -64,7 +302,7 @@ class ManagerInterface:
         else:
             await update.message.reply_text(
                 MANAGER_TEXTS['auth']['invalid_password'],
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
             context.user_data['awaiting_manager_password'] = False
             return False
@@ -82,7 +320,7 @@ class ManagerInterface:
             else:
                 await update.message.reply_text(
                     MANAGER_TEXTS['auth']['not_authorized'],
-                    parse_mode='HTML'
+                    parse_mode=ParseMode.HTML
                 )
             return False
         return True
@@ -93,31 +331,21 @@ class ManagerInterface:
             return
         
         user_id = update.effective_user.id
-        session_info = auth_manager.get_session_info(user_id)
         time_left = auth_manager.get_session_time_left(user_id)
         
-        keyboard = [
-            [InlineKeyboardButton(BUTTONS['manager_menu']['stats'], callback_data="mgr_stats")],
-            [InlineKeyboardButton(BUTTONS['manager_menu']['users'], callback_data="mgr_users"),
-             InlineKeyboardButton(BUTTONS['manager_menu']['export'], callback_data="mgr_export")],
-            [InlineKeyboardButton(BUTTONS['manager_menu']['broadcast'], callback_data="mgr_broadcast")],
-            [InlineKeyboardButton(BUTTONS['manager_menu']['settings'], callback_data="mgr_settings"),
-             InlineKeyboardButton(BUTTONS['manager_menu']['clear'], callback_data="mgr_clear")],
-            [InlineKeyboardButton("🚪 Выход", callback_data="mgr_logout")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        menu_text = (
-            f"{MANAGER_TEXTS['menu']['title']}\n\n"
-            f"{MANAGER_TEXTS['menu']['description']}\n\n"
-            f"⏰ Сессия истекает через: {time_left // 60} мин {time_left % 60} сек\n"
-            f"👤 Активных сессий: {auth_manager.get_active_sessions_count()}"
-        )
+        minutes, seconds = divmod(time_left, 60)
+        menu_text = MANAGER_MENU_TEMPLATE.format_map({
+            'minutes': minutes,
+            'seconds': seconds,
+            'sessions': auth_manager.get_active_sessions_count()
+        })
         
         if update.message:
-            await update.message.reply_text(menu_text, parse_mode='HTML', reply_markup=reply_markup)
+            await update.message.reply_text(menu_text, parse_mode=ParseMode.HTML, reply_markup=MANAGER_MENU_MARKUP)
         elif update.callback_query:
-            await update.callback_query.edit_message_text(menu_text, parse_mode='HTML', reply_markup=reply_markup)
+            query = update.callback_query
+            await query.answer()
+            await query.edit_message_text(menu_text, parse_mode=ParseMode.HTML, reply_markup=MANAGER_MENU_MARKUP)
     
     async def show_detailed_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать детальную статистику"""
@@ -125,11 +353,13 @@ class ManagerInterface:
             return
         
         query = update.callback_query
-        await query.answer()
-        
-        stats = self._get_detailed_stats()
+        # Ответ на callback и запросы к БД независимы - выполняем одновременно
+        _, stats = await asyncio.gather(
+            query.answer(),
+            asyncio.to_thread(self._get_detailed_stats)
+        )
         
-        stats_text = (
+        parts = [
             f"{MANAGER_TEXTS['stats']['detailed_title']}\n\n"
             f"👥 Всего участников: {stats['total']}\n"
             f"📧 Подписаны на рассылку: {stats['newsletter']}\n"
@@ -139,79 +369,82 @@ class ManagerInterface:
             f"📅 Новые за месяц: {stats['month_new']}\n"
             f"🎂 Средний возраст: {stats['avg_age']:.1f} лет\n\n"
             f"📊 <b>Возрастное распределение:</b>\n"
-        )
-        
-        for age_group, count in stats['age_groups'].items():
-            stats_text += f"• {age_group}: {count} чел.\n"
-        
-        stats_text += f"\n📈 <b>Регистрации по дням (последние 7 дней):</b>\n"
-        for date, count in stats['daily_registrations'].items():
-            stats_text += f"• {date}: {count} чел.\n"
-        
-        keyboard = [
-            [InlineKeyboardButton("📊 Экспорт статистики", callback_data="mgr_export_stats")],
-            [InlineKeyboardButton("🔄 Обновить", callback_data="mgr_stats")],
-            [InlineKeyboardButton("🔙 Назад", callback_data="mgr_menu")]
         ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        parts.extend(f"• {age_group}: {count} чел.\n" for age_group, count in stats['age_groups'].items())
+        parts.append("\n📈 <b>Регистрации по дням (последние 7 дней):</b>\n")
+        parts.extend(f"• {date}: {count} чел.\n" for date, count in stats['daily_registrations'].items())
+        stats_text = "".join(parts)
         
-        await query.edit_message_text(stats_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(stats_text, parse_mode=ParseMode.HTML, reply_markup=STATS_MARKUP)
     
-    async def show_users_list(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 1) -> None:
-        """Показать список пользователей с пагинацией"""
+    async def show_users_list(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                              page: int = 1, cursor: Optional[tuple] = None) -> None:
+        """
+        Показать список пользователей с пагинацией
+        
+        cursor - (направление 'n'/'p', registration_date, telegram_id) крайней строки
+        соседней страницы; без него показывается первая страница
+        """
         if not await self.check_auth(update, context):
             return
         
         query = update.callback_query
-        await query.answer()
         
         users_per_page = SETTINGS['pagination']['users_per_page']
-        offset = (page - 1) * users_per_page
+        if cursor is None:
+            page = 1
         
-        users, total_count = self._get_users_page(offset, users_per_page)
+        _, (users, total_count, has_next) = await asyncio.gather(
+            query.answer(),
+            asyncio.to_thread(self._get_users_page, cursor, users_per_page)
+        )
         
         if not users:
             await query.edit_message_text(
                 MANAGER_TEXTS['users']['no_users'],
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
             return
         
-        users_text = f"👥 <b>Пользователи (стр. {page})</b>\n\n"
-        users_text += f"Показано {len(users)} из {total_count}\n\n"
-        
-        for user in users:
-            newsletter_status = "✅" if user['newsletter_consent'] else "❌"
-            users_text += (
-                f"👤 <b>{user['name']}</b> ({user['age']} лет)\n"
-                f"   📚 Опыт: {user['english_experience']}\n"
-                f"   📧 Рассылка: {newsletter_status}\n"
-                f"   📅 {user['registration_date']}\n"
-                f"   🆔 ID: {user['telegram_id']}\n\n"
+        parts = [
+            f"👥 <b>Пользователи (стр. {page})</b>\n\n"
+            f"Показано {len(users)} из {total_count}\n\n"
+        ]
+        parts.extend(
+            USERS_LIST_ENTRY_TEMPLATE.format(
+                newsletter_mark=NEWSLETTER_MARKS[user['newsletter_consent']],
+                **user
             )
+            for user in users
+        )
+        users_text = "".join(parts)
         
         # Создаем кнопки пагинации
         keyboard = []
         nav_buttons = []
         
+        # В callback_data - ключ крайней строки: соседняя страница читается по индексу без пропуска строк
         if page > 1:
-            nav_buttons.append(InlineKeyboardButton("⬅️ Предыдущая", callback_data=f"mgr_users_page_{page-1}"))
-        
-        total_pages = (total_count + users_per_page - 1) // users_per_page
-        if page < total_pages:
-            nav_buttons.append(InlineKeyboardButton("Следующая ➡️", callback_data=f"mgr_users_page_{page+1}"))
+            first = users[0]
+            nav_buttons.append(InlineKeyboardButton(
+                "⬅️ Предыдущая",
+                callback_data=f"mgr_users_page_{page-1}_p_{first['telegram_id']}_{first['registration_date']}"
+            ))
+        
+        if has_next:
+            last = users[-1]
+            nav_buttons.append(InlineKeyboardButton(
+                "Следующая ➡️",
+                callback_data=f"mgr_users_page_{page+1}_n_{last['telegram_id']}_{last['registration_date']}"
+            ))
         
         if nav_buttons:
             keyboard.append(nav_buttons)
         
-        keyboard.extend([
-            [InlineKeyboardButton("🔍 Поиск пользователя", callback_data="mgr_search_user")],
-            [InlineKeyboardButton("📊 Статистика пользователей", callback_data="mgr_user_stats")],
-            [InlineKeyboardButton("🔙 Назад", callback_data="mgr_menu")]
-        ])
+        keyboard.extend(USERS_LIST_TOOL_ROWS)
         
         reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(users_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(users_text, parse_mode=ParseMode.HTML, reply_markup=reply_markup)
     
     async def export_users_data(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Экспорт данных пользователей"""
@@ -221,53 +454,33 @@ class ManagerInterface:
         query = update.callback_query
         await query.answer("Готовлю экспорт...")
         
-        users = self._get_all_users()
+        filename = datetime.now().strftime(FILES['users_export'])
+        # CSV собирается в памяти в рабочем потоке: без временного файла на диске,
+        # и на больших выгрузках цикл событий не останавливается
+        document, exported_count = await asyncio.to_thread(self._build_users_csv)
         
-        if not users:
+        if not exported_count:
             await query.edit_message_text(
                 MANAGER_TEXTS['export']['no_data'],
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
             return
         
-        filename = f"users_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'Telegram ID', 'Username', 'Имя', 'Возраст', 'Опыт изучения',
-                'Согласие на данные', 'Согласие на рассылку', 'Дата регистрации'
-            ])
-            
-            for user in users:
-                writer.writerow([
-                    user['telegram_id'], user['username'], user['name'],
-                    user['age'], user['english_experience'],
-                    'Да' if user['data_consent'] else 'Нет',
-                    'Да' if user['newsletter_consent'] else 'Нет',
-                    user['registration_date']
-                ])
-        
         success_text = MANAGER_TEXTS['export']['success'].format(
-            filename=filename, count=len(users)
+            filename=filename, count=exported_count
         )
         
-        await query.edit_message_text(success_text, parse_mode='HTML')
+        await query.edit_message_text(success_text, parse_mode=ParseMode.HTML)
         
         # Отправляем файл
         try:
             await query.message.reply_document(
-                document=open(filename, 'rb'),
-                caption=MANAGER_TEXTS['export']['caption'].format(count=len(users))
+                document=document,
+                filename=filename,
+                caption=MANAGER_TEXTS['export']['caption'].format(count=exported_count)
             )
         except Exception as e:
             await query.message.reply_text(f"❌ Ошибка при отправке файла: {e}")
-        finally:
-            # Удаляем временный файл
-            try:
-                os.remove(filename)
-            except:
-                pass
     
     async def start_broadcast(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Начать процесс рассылки"""
@@ -281,7 +494,7 @@ class ManagerInterface:
         
         await query.edit_message_text(
             MANAGER_TEXTS['broadcast']['request_message'],
-            parse_mode='HTML'
+            parse_mode=ParseMode.HTML
         )
         
         # Сохраняем состояние ожидания сообщения для рассылки
@@ -305,28 +518,21 @@ class ManagerInterface:
             return True
         
         # Получаем количество получателей
-        recipients_count = self._get_newsletter_subscribers_count()
+        recipients_count = await asyncio.to_thread(self._get_newsletter_subscribers_count)
         
         confirm_text = MANAGER_TEXTS['broadcast']['confirm_template'].format(
             message=message_text,
             count=recipients_count
         )
         
-        keyboard = [
-            [InlineKeyboardButton("📤 Отправить", callback_data="mgr_broadcast_confirm")],
-            [InlineKeyboardButton("❌ Отмена", callback_data="mgr_broadcast_cancel")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        # Сохраняем сообщение для рассылки
-        self.broadcast_sessions[user_id] = {
-            'message': message_text,
-            'recipients_count': recipients_count
-        }
+        # Сохраняем сообщение для рассылки (заодно убираем брошенные черновики)
+        self._cleanup_broadcast_sessions()
+        self.broadcast_sessions.pop(user_id, None)
+        self.broadcast_sessions[user_id] = BroadcastSession(message_text, recipients_count, time.monotonic())
         
         context.user_data['awaiting_broadcast_message'] = False
         
-        await update.message.reply_text(confirm_text, parse_mode='HTML', reply_markup=reply_markup)
+        await update.message.reply_text(confirm_text, parse_mode=ParseMode.HTML, reply_markup=BROADCAST_CONFIRM_MARKUP)
         return True
     
     async def confirm_broadcast(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -339,48 +545,86 @@ class ManagerInterface:
         
         user_id = query.from_user.id
         
-        if user_id not in self.broadcast_sessions:
+        # Сессия забирается сразу: повторное нажатие во время рассылки не запустит ее второй раз
+        broadcast_session = self.broadcast_sessions.pop(user_id, None)
+        if broadcast_session is None or time.monotonic() - broadcast_session.created_at > BROADCAST_SESSION_TTL:
             await query.edit_message_text("❌ Сессия рассылки истекла. Начните заново.")
             return
         
-        broadcast_data = self.broadcast_sessions[user_id]
-        message_text = broadcast_data['message']
+        message_text = broadcast_session.message
         
         await query.edit_message_text(MANAGER_TEXTS['broadcast']['sending'])
         
-        # Получаем список получателей
-        recipients = self._get_newsletter_subscribers()
+        # Текст одинаков для всех получателей - собираем один раз
+        broadcast_text = BROADCAST_HEADER + message_text
         
-        sent_count = 0
-        failed_count = 0
+        # Получатели читаются из БД пачками и сразу передаются отправителям через очередь:
+        # первое сообщение уходит после первой пачки, а не после чтения всех подписчиков
+        recipients = asyncio.Queue(maxsize=BROADCAST_CONCURRENCY * 2)
         
-        for recipient in recipients:
+        async def read_recipients() -> None:
             try:
-                await context.bot.send_message(
-                    chat_id=recipient['telegram_id'],
-                    text=f"📢 <b>Сообщение от английского клуба:</b>\n\n{message_text}",
-                    parse_mode='HTML'
-                )
-                sent_count += 1
-                
-                # Пауза между отправками для избежания лимитов
-                await asyncio.sleep(0.1)
-                
-            except TelegramError as e:
-                failed_count += 1
-                print(f"Ошибка отправки сообщения пользователю {recipient['telegram_id']}: {e}")
+                async for chat_id in self._iter_newsletter_chat_ids():
+                    await recipients.put(chat_id)
+            finally:
+                # Сигнал завершения каждому отправителю (и при ошибке чтения - чтобы они не ждали вечно)
+                for _ in range(BROADCAST_CONCURRENCY):
+                    await recipients.put(None)
+        
+        async def send_messages() -> tuple:
+            sent = failed = 0
+            while (chat_id := await recipients.get()) is not None:
+                try:
+                    if await send_message(chat_id):
+                        sent += 1
+                    else:
+                        failed += 1
+                finally:
+                    # Следующее сообщение - через секунду: ограничение скорости для лимитов Telegram
+                    await asyncio.sleep(1)
+            return sent, failed
+        
+        async def send_message(chat_id: int) -> bool:
+            for attempt in range(BROADCAST_RETRY_ATTEMPTS + 1):
+                try:
+                    await context.bot.send_message(
+                        chat_id=chat_id,
+                        text=broadcast_text,
+                        parse_mode=ParseMode.HTML
+                    )
+                    return True
+                except RetryAfter as e:
+                    # Flood control: ждем, сколько просит Telegram, и отправляем снова
+                    if attempt == BROADCAST_RETRY_ATTEMPTS:
+                        logger.warning("Сообщение пользователю %s не отправлено: %s", chat_id, e)
+                        return False
+                    await asyncio.sleep(e.retry_after)
+                except Exception as e:
+                    logger.warning("Ошибка отправки сообщения пользователю %s: %s", chat_id, e)
+                    return False
+        
+        # Сообщения отправляются параллельно, не более BROADCAST_CONCURRENCY одновременно;
+        # ошибка одной задачи не прерывает остальные и итог все равно дойдет до менеджера
+        reader_result, *results = await asyncio.gather(
+            read_recipients(),
+            *(send_messages() for _ in range(BROADCAST_CONCURRENCY)),
+            return_exceptions=True
+        )
+        for result in (reader_result, *results):
+            if isinstance(result, BaseException):
+                logger.error("Ошибка при рассылке", exc_info=result)
+        results = [result for result in results if not isinstance(result, BaseException)]
+        sent_count = sum(sent for sent, _ in results)
+        failed_count = sum(failed for _, failed in results)
         
         success_text = MANAGER_TEXTS['broadcast']['success'].format(
-            sent=sent_count, total=len(recipients)
+            sent=sent_count, total=sent_count + failed_count
         )
         
         if failed_count > 0:
             success_text += f"\n⚠️ Не доставлено: {failed_count}"
         
-        await query.edit_message_text(success_text, parse_mode='HTML')
-        
-        # Очищаем сессию рассылки
-        del self.broadcast_sessions[user_id]
+        await query.edit_message_text(success_text, parse_mode=ParseMode.HTML)
     
     async def cancel_broadcast(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Отмена рассылки"""
@@ -388,18 +632,34 @@ class ManagerInterface:
         await query.answer()
         
         user_id = query.from_user.id
-        if user_id in self.broadcast_sessions:
-            del self.broadcast_sessions[user_id]
+        self.broadcast_sessions.pop(user_id, None)
         
         await query.edit_message_text(MANAGER_TEXTS['broadcast']['cancelled'])
     
+    def _cleanup_broadcast_sessions(self) -> None:
+        """Удалить просроченные черновики рассылки и самые старые сверх лимита"""
+        now = time.monotonic()
+        expired = [
+            user_id for user_id, session in self.broadcast_sessions.items()
+            if now - session.created_at > BROADCAST_SESSION_TTL
+        ]
+        for user_id in expired:
+            del self.broadcast_sessions[user_id]
+        
+        # Словарь хранит порядок добавления - первыми идут самые старые
+        while len(self.broadcast_sessions) >= BROADCAST_SESSIONS_LIMIT:
+            del self.broadcast_sessions[next(iter(self.broadcast_sessions))]
+    
     async def show_bot_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать настройки бота"""
         if not await self.check_auth(update, context):
             return
         
         query = update.callback_query
-        await query.answer()
+        _, db_size = await asyncio.gather(
+            query.answer(),
+            asyncio.to_thread(self._get_db_size)
+        )
         
         settings_text = (
             "⚙️ <b>Настройки бота</b>\n\n"
@@ -410,20 +670,12 @@ class ManagerInterface:
             f"• Максимальная длина имени: {SETTINGS['text_limits']['max_name_length']}\n"
             f"• Лимиты возраста: {SETTINGS['age_limits']['min']}-{SETTINGS['age_limits']['max']}\n\n"
             "<b>Статистика системы:</b>\n"
-            f"• Размер БД: {self._get_db_size():.2f} MB\n"
+            f"• Размер БД: {db_size:.2f} MB\n"
             f"• Активных сессий: {auth_manager.get_active_sessions_count()}\n"
             f"• Время работы бота: {self._get_uptime()}"
         )
         
-        keyboard = [
-            [InlineKeyboardButton("🔄 Перезагрузить конфиг", callback_data="mgr_reload_config")],
-            [InlineKeyboardButton("🧹 Очистить сессии", callback_data="mgr_cleanup_sessions")],
-            [InlineKeyboardButton("📊 Системная информация", callback_data="mgr_system_info")],
-            [InlineKeyboardButton("🔙 Назад", callback_data="mgr_menu")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(settings_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(settings_text, parse_mode=ParseMode.HTML, reply_markup=BOT_SETTINGS_MARKUP)
     
     async def logout(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Выход из системы"""
@@ -439,172 +691,146 @@ class ManagerInterface:
         await query.edit_message_text(
             "👋 <b>Вы вышли из системы управления</b>\n\n"
             "Для повторного входа используйте команду /manager",
-            parse_mode='HTML'
+            parse_mode=ParseMode.HTML
         )
     
     def _get_detailed_stats(self) -> Dict:
         """Получить детальную статистику"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Основная статистика
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM users WHERE newsletter_consent = 1")
-        newsletter = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM users WHERE english_experience = 'Да'")
-        experienced = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT AVG(age) FROM users WHERE age IS NOT NULL")
-        avg_age = cursor.fetchone()[0] or 0
-        
-        cursor.execute("SELECT COUNT(*) FROM users WHERE registration_date >= date('now', '-7 days')")
-        week_new = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM users WHERE registration_date >= date('now', '-30 days')")
-        month_new = cursor.fetchone()[0]
-        
-        # Возрастное распределение
+        return self._cached('detailed_stats', self._query_detailed_stats)
+    
+    def _query_detailed_stats(self) -> Dict:
+        """Запрос детальной статистики из БД"""
+        with self._db() as conn:
+            total, newsletter, experienced, avg_age, week_new, month_new = conn.execute(
+                DETAILED_STATS_QUERY
+            ).fetchone()
+            group_rows = conn.execute(DETAILED_STATS_GROUPS_QUERY).fetchall()
+        
+        # Строки второго запроса отсортированы по виду группы и значению
         age_groups = {}
-        cursor.execute("""
-            SELECT 
-                CASE 
-                    WHEN age < 18 THEN 'До 18'
-                    WHEN age < 25 THEN '18-24'
-                    WHEN age < 35 THEN '25-34'
-                    WHEN age < 45 THEN '35-44'
-                    WHEN age < 55 THEN '45-54'
-                    ELSE '55+'
-                END as age_group,
-                COUNT(*) as count
-            FROM users 
-            WHERE age IS NOT NULL
-            GROUP BY age_group
-        """)
-        
-        for row in cursor.fetchall():
-            age_groups[row[0]] = row[1]
-        
-        # Регистрации по дням
-        daily_registrations = {}
-        cursor.execute("""
-            SELECT DATE(registration_date) as reg_date, COUNT(*) as count
-            FROM users 
-            WHERE registration_date >= date('now', '-7 days')
-            GROUP BY DATE(registration_date)
-            ORDER BY reg_date DESC
-        """)
-        
-        for row in cursor.fetchall():
-            daily_registrations[row[0]] = row[1]
-        
-        conn.close()
+        daily_registrations = []
+        for kind, key, count in group_rows:
+            if kind == 'age':
+                age_groups[key] = count
+            else:
+                daily_registrations.append((key, count))
         
         return {
             'total': total,
             'newsletter': newsletter,
             'experienced': experienced,
             'beginners': total - experienced,
-            'avg_age': avg_age,
+            'avg_age': avg_age or 0,
             'week_new': week_new,
             'month_new': month_new,
             'age_groups': age_groups,
-            'daily_registrations': daily_registrations
+            # Последние дни - первыми
+            'daily_registrations': dict(reversed(daily_registrations))
         }
     
-    def _get_users_page(self, offset: int, limit: int) -> tuple:
-        """Получить страницу пользователей"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Получаем пользователей для текущей страницы
-        cursor.execute('''
-            SELECT telegram_id, username, name, age, english_experience, 
-                   newsletter_consent, registration_date
-            FROM users 
-            ORDER BY registration_date DESC 
-            LIMIT ? OFFSET ?
-        ''', (limit, offset))
-        
-        users = []
-        for row in cursor.fetchall():
-            users.append({
-                'telegram_id': row[0],
-                'username': row[1],
-                'name': row[2],
-                'age': row[3],
-                'english_experience': row[4],
-                'newsletter_consent': bool(row[5]),
-                'registration_date': row[6]
-            })
-        
-        # Получаем общее количество
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_count = cursor.fetchone()[0]
-        
-        conn.close()
-        return users, total_count
-    
-    def _get_all_users(self) -> List[Dict]:
-        """Получить всех пользователей"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT telegram_id, username, name, age, english_experience, 
-                   data_consent, newsletter_consent, registration_date
-            FROM users ORDER BY registration_date DESC
-        ''')
-        
-        users = []
-        for row in cursor.fetchall():
-            users.append({
-                'telegram_id': row[0],
-                'username': row[1] or '',
-                'name': row[2],
-                'age': row[3],
-                'english_experience': row[4],
-                'data_consent': bool(row[5]),
-                'newsletter_consent': bool(row[6]),
-                'registration_date': row[7]
-            })
-        
-        conn.close()
-        return users
-    
-    def _get_newsletter_subscribers(self) -> List[Dict]:
-        """Получить подписчиков рассылки"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT telegram_id, name FROM users 
-            WHERE newsletter_consent = 1
-        ''')
-        
-        subscribers = []
-        for row in cursor.fetchall():
-            subscribers.append({
-                'telegram_id': row[0],
-                'name': row[1]
-            })
-        
-        conn.close()
-        return subscribers
+    def _get_users_page(self, cursor: Optional[tuple], limit: int) -> tuple:
+        """
+        Получить страницу пользователей (cursor - см. show_users_list)
+        
+        Возвращает (пользователи, всего пользователей, есть ли следующая страница)
+        """
+        with self._db() as conn:
+            if cursor is None:
+                direction = 'n'
+                rows = conn.execute(USERS_FIRST_PAGE_QUERY, (limit + 1,))
+            else:
+                direction, registration_date, telegram_id = cursor
+                page_query = USERS_PREV_PAGE_QUERY if direction == 'p' else USERS_NEXT_PAGE_QUERY
+                rows = conn.execute(page_query, (registration_date, telegram_id, limit + 1))
+            
+            # Строки берутся прямо из курсора, без промежуточного списка кортежей;
+            # лишняя строка сверх страницы показывает, есть ли еще строки - без подсчета всей таблицы
+            users = list(islice(rows, limit))
+            has_more = rows.fetchone() is not None
+            # Курсор дочитан не до конца - закрываем, чтобы не держать открытым чтение БД
+            rows.close()
+        
+        if direction == 'p':
+            # Предыдущая страница читается в обратном порядке - разворачиваем;
+            # следующая за ней - та, с которой пришли
+            users.reverse()
+            has_next = True
+        else:
+            has_next = has_more
+        
+        # Общее количество - только для подписи, берется из кэша статистики
+        total_count = self._cached('users_count', self._query_users_count)
+        return users, total_count, has_next
+    
+    def _query_users_count(self) -> int:
+        """Запрос общего количества пользователей из БД"""
+        with self._db() as conn:
+            return conn.execute(USERS_COUNT_QUERY).fetchone()[0]
+    
+    def _build_users_csv(self) -> tuple:
+        """Выгрузить всех пользователей в CSV в памяти; возвращает (содержимое файла, число строк)"""
+        with self._db() as conn:
+            cursor = conn.execute(USERS_EXPORT_QUERY)
+            
+            # Строки читаются из курсора пачками и сразу пишутся в буфер, без списка всех пользователей
+            chunk = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                return None, 0
+            
+            exported_count = 0
+            buffer = io.BytesIO()
+            csvfile = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+            writer = csv.writer(csvfile)
+            writer.writerow(USERS_CSV_HEADER)
+            
+            while chunk:
+                writer.writerows(
+                    (telegram_id, username or '', name, age, english_experience,
+                     'Да' if data_consent else 'Нет',
+                     'Да' if newsletter_consent else 'Нет',
+                     registration_date)
+                    for (telegram_id, username, name, age, english_experience,
+                         data_consent, newsletter_consent, registration_date) in chunk
+                )
+                exported_count += len(chunk)
+                chunk = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            
+            # detach() дописывает текст в буфер и отвязывает обертку, не закрывая буфер
+            csvfile.detach()
+        
+        return buffer.getvalue(), exported_count
+    
+    async def _iter_newsletter_chat_ids(self):
+        """telegram_id подписчиков рассылки; каждая пачка читается из БД в рабочем потоке"""
+        after_id = 0
+        while True:
+            rows = await asyncio.to_thread(self._get_newsletter_chat_ids_chunk, after_id)
+            for _, chat_id in rows:
+                yield chat_id
+            if len(rows) < BROADCAST_FETCH_SIZE:
+                return
+            after_id = rows[-1][0]
+    
+    def _get_newsletter_chat_ids_chunk(self, after_id: int) -> list:
+        """Пачка (id, telegram_id) подписчиков с id больше after_id"""
+        with self._db() as conn:
+            return conn.execute(SUBSCRIBER_IDS_CHUNK_QUERY, (after_id, BROADCAST_FETCH_SIZE)).fetchall()
     
     def _get_newsletter_subscribers_count(self) -> int:
         """Получить количество подписчиков рассылки"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users WHERE newsletter_consent = 1")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self._cached('subscribers_count', self._query_newsletter_subscribers_count)
+    
+    def _query_newsletter_subscribers_count(self) -> int:
+        """Запрос количества подписчиков рассылки из БД"""
+        with self._db() as conn:
+            return conn.execute(SUBSCRIBERS_COUNT_QUERY).fetchone()[0]
     
     def _get_db_size(self) -> float:
         """Получить размер базы данных в MB"""
+        return self._cached('db_size', self._read_db_size)
+    
+    def _read_db_size(self) -> float:
+        """Размер файла базы данных в MB"""
         try:
             size_bytes = os.path.getsize(self.db_path)
             return size_bytes / (1024 * 1024)
@@ -4,24 +4,27 @@
 Скрипт запуска бота с проверкой конфигурации
 """
 
+import importlib.util
 import os
 import sys
+from typing import Dict
 
-def check_requirements():
+def check_requirements(env: Dict[str, str]):
     """Проверка установленных зависимостей"""
-    try:
-        import telegram
-        print("✅ python-telegram-bot установлен")
-    except ImportError:
+    # Пакет только ищется, а не импортируется: при неудачных проверках дерево модулей
+    # telegram не загружается вовсе, а при запуске его все равно импортирует bot
+    if importlib.util.find_spec('telegram') is None:
         print("❌ Не установлен python-telegram-bot")
         print("Выполните: pip install -r requirements.txt")
         return False
     
+    print("✅ python-telegram-bot установлен")
+    
     return True
 
-def check_token():
+def check_token(env: Dict[str, str]):
     """Проверка наличия токена бота"""
-    token = os.getenv('BOT_TOKEN')
+    token = env.get('BOT_TOKEN')
     if not token or token == 'YOUR_BOT_TOKEN_HERE':
         print("❌ BOT_TOKEN не установлен!")
         print("\nДля настройки токена:")
@@ -36,12 +39,16 @@ def check_token():
     print(f"✅ BOT_TOKEN установлен: {token[:10]}...")
     return True
 
-def check_files():
+def check_files(env: Dict[str, str]):
     """Проверка необходимых файлов"""
     files_status = []
     
+    # Один проход по каталогу вместо отдельного stat() на каждый файл
+    with os.scandir('.') as entries:
+        present = {entry.name for entry in entries if entry.is_file()}
+    
     # Проверяем основной файл бота
-    if os.path.exists('bot.py'):
+    if 'bot.py' in present:
         files_status.append("✅ bot.py найден")
     else:
         files_status.append("❌ bot.py не найден")
@@ -49,13 +56,13 @@ def check_files():
     
     # Проверяем файлы документов (опционально)
     snaop_file = "СнаОП с прочерками.pdf"
-    if os.path.exists(snaop_file):
+    if snaop_file in present:
         files_status.append(f"✅ {snaop_file} найден")
     else:
         files_status.append(f"⚠️ {snaop_file} не найден (будет пропущен)")
     
     consent_file = "Согласие_на_рассылку_информационных_и_рекламных_сообщений_с_прочерками.pdf"
-    if os.path.exists(consent_file):
+    if consent_file in present:
         files_status.append(f"✅ {consent_file} найден")
     else:
         files_status.append(f"⚠️ {consent_file} не найден (будет пропущен)")
@@ -65,38 +72,58 @@ def check_files():
     
     return True
 
+def parse_env(text: str) -> Dict[str, str]:
+    """Разбор содержимого .env-файла (строки КЛЮЧ=значение, # - комментарии)"""
+    return dict(
+        line.strip().split('=', 1)
+        for line in text.splitlines()
+        if line.strip() and not line.startswith('#')
+    )
+
+# (название, функция, критичная): после провала критичной проверки остальные не выполняются
+CHECKS = (
+    ("Зависимости Python", check_requirements, True),
+    ("Токен бота", check_token, False),
+    ("Файлы проекта", check_files, True),
+)
+
 def main():
     """Главная функция проверки и запуска"""
     print("🤖 Проверка конфигурации Telegram-бота для английского клуба\n")
     
+    # Снимок окружения: проверки читают значения из словаря, а не из os.environ
+    env = dict(os.environ)
+    
     # Загружаем переменные из .env или config.env если файл существует
     env_files = ['.env', 'config.env']
     for env_file in env_files:
-        if os.path.exists(env_file):
-            print(f"📄 Загружаем переменные из {env_file} файла")
-            try:
-                with open(env_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip() and not line.startswith('#'):
-                            key, value = line.strip().split('=', 1)
-                            os.environ[key] = value
-                break
-            except UnicodeDecodeError:
-                print(f"⚠️ Ошибка кодировки в файле {env_file}, пробуем следующий...")
-                continue
+        # Сразу открываем файл: отсутствие проверяется самим open, без отдельного stat()
+        try:
+            f = open(env_file, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            continue
+        
+        print(f"📄 Загружаем переменные из {env_file} файла")
+        try:
+            with f:
+                values = parse_env(f.read())
+        except UnicodeDecodeError:
+            print(f"⚠️ Ошибка кодировки в файле {env_file}, пробуем следующий...")
+            continue
+        
+        # bot.py читает os.environ при импорте - записываем и туда, и в снимок
+        os.environ.update(values)
+        env.update(values)
+        break
     
     # Проверяем все компоненты
-    checks = [
-        ("Зависимости Python", check_requirements),
-        ("Токен бота", check_token),
-        ("Файлы проекта", check_files)
-    ]
-    
     all_ok = True
-    for name, check_func in checks:
+    for name, check_func, critical in CHECKS:
         print(f"\n📋 Проверка: {name}")
-        if not check_func():
+        if not check_func(env):
             all_ok = False
+            if critical:
+                break
     
     if all_ok:
         print("\n🚀 Все проверки пройдены! Запускаем бота...")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Неизменяемые клавиатуры с кэшированным представлением для отправки
+"""
+
+from telegram import InlineKeyboardMarkup
+
+
+class StaticInlineKeyboardMarkup(InlineKeyboardMarkup):
+    """
+    Inline-клавиатура, которая сериализуется один раз.
+
+    При каждом запросе python-telegram-bot вызывает to_dict() у reply_markup
+    и рекурсивно обходит все кнопки. Для клавиатур, созданных один раз на уровне
+    модуля, результат всегда одинаковый, поэтому он вычисляется при создании.
+    Возвращаемый словарь общий - изменять его нельзя.
+    """
+
+    __slots__ = ('_dict_cache',)
+
+    def __init__(self, inline_keyboard, **kwargs):
+        super().__init__(inline_keyboard, **kwargs)
+        # Атрибуты с подчеркиванием можно задавать и у "замороженного" объекта
+        self._dict_cache = super().to_dict()
+
+    def to_dict(self, recursive: bool = True) -> dict:
+        """Готовое представление для запроса (рекурсивный вариант берется из кэша)"""
+        if recursive:
+            return self._dict_cache
+        return super().to_dict(recursive=False)
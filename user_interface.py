@@ -6,41 +6,197 @@
 
 import sqlite3
 import os
+import logging
+import asyncio
+import functools
+import time
 from datetime import datetime
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
+from telegram import Update, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
+from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 from dialog_config import DIALOG_TEXTS, BUTTONS, SETTINGS
+from static_markup import StaticInlineKeyboardMarkup
+
+logger = logging.getLogger(__name__)
+
+# Общие строки кнопок навигации
+BACK_TO_MENU_ROW = (InlineKeyboardButton("🔙 Назад в меню", callback_data="user_menu"),)
+BACK_TO_HELP_ROW = (InlineKeyboardButton("🔙 Назад к справке", callback_data="user_help"),)
+
+# Главное меню пользователя: текст и клавиатура не меняются, собираются один раз
+USER_MENU_TEXT = (
+    "🇬🇧 <b>Главное меню</b>\n\n"
+    "Добро пожаловать! Выберите действие:"
+)
+USER_MENU_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton(BUTTONS['user_menu']['profile'], callback_data="user_profile")],
+    [InlineKeyboardButton(BUTTONS['user_menu']['help'], callback_data="user_help")],
+    [InlineKeyboardButton(BUTTONS['user_menu']['settings'], callback_data="user_settings")]
+])
+
+# Неизменяемые клавиатуры и тексты пользовательских экранов
+PROFILE_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("✏️ Изменить данные", callback_data="user_edit_profile")],
+    [InlineKeyboardButton("🔄 Обновить профиль", callback_data="user_profile")],
+    BACK_TO_MENU_ROW
+])
+
+HELP_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("📞 Связаться с поддержкой", callback_data="user_support")],
+    [InlineKeyboardButton("📚 Полезные материалы", callback_data="user_materials")],
+    BACK_TO_MENU_ROW
+])
+
+DELETE_CONFIRM_TEXT = (
+    "⚠️ <b>ВНИМАНИЕ!</b>\n\n"
+    "Вы собираетесь <b>полностью удалить</b> свой аккаунт из системы.\n"
+    "Это действие нельзя отменить!\n\n"
+    "Будут удалены:\n"
+    "• Все ваши персональные данные\n"
+    "• История участия в клубе\n"
+    "• Настройки профиля\n\n"
+    "Вы уверены, что хотите продолжить?"
+)
+
+DELETE_CONFIRM_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("🗑️ Да, удалить аккаунт", callback_data="user_delete_confirmed")],
+    [InlineKeyboardButton("❌ Отмена", callback_data="user_settings")]
+])
+
+SUPPORT_TEXT = (
+    "📞 <b>Поддержка</b>\n\n"
+    "Если у вас есть вопросы или проблемы, вы можете:\n\n"
+    "1. Написать администратору: @admin_username\n"
+    "2. Отправить email: support@englishclub.com\n"
+    "3. Позвонить: +7 (XXX) XXX-XX-XX\n\n"
+    "⏰ <b>Время работы поддержки:</b>\n"
+    "Пн-Пт: 9:00 - 18:00\n"
+    "Сб-Вс: 10:00 - 16:00\n\n"
+    "Мы стараемся отвечать в течение 24 часов!"
+)
+
+SUPPORT_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("📧 Написать в поддержку", callback_data="user_write_support")],
+    BACK_TO_HELP_ROW
+])
+
+MATERIALS_TEXT = (
+    "📚 <b>Полезные материалы</b>\n\n"
+    "🎯 <b>Для начинающих:</b>\n"
+    "• Базовая грамматика\n"
+    "• Первые 1000 слов\n"
+    "• Простые диалоги\n\n"
+    "📈 <b>Средний уровень:</b>\n"
+    "• Времена в английском\n"
+    "• Деловая лексика\n"
+    "• Аудирование\n\n"
+    "🏆 <b>Продвинутый уровень:</b>\n"
+    "• Идиомы и фразеологизмы\n"
+    "• Подготовка к экзаменам\n"
+    "• Разговорная практика\n\n"
+    "📱 <b>Мобильные приложения:</b>\n"
+    "• Duolingo\n"
+    "• Anki для карточек\n"
+    "• BBC Learning English"
+)
+
+MATERIALS_MARKUP = StaticInlineKeyboardMarkup([
+    [InlineKeyboardButton("📖 Скачать материалы", callback_data="user_download_materials")],
+    [InlineKeyboardButton("🎮 Игры и тесты", callback_data="user_games")],
+    BACK_TO_HELP_ROW
+])
+
+# Статус рассылки по значению newsletter_consent
+NEWSLETTER_STATUS_LABELS = ("❌ Отключена", "✅ Включена")
+
+def _build_settings_screen(newsletter_consent: bool) -> tuple:
+    """Текст и клавиатура экрана настроек для заданного состояния подписки"""
+    newsletter_action = "Отключить" if newsletter_consent else "Включить"
+    
+    settings_text = (
+        f"⚙️ <b>Настройки</b>\n\n"
+        f"<b>Текущие настройки:</b>\n"
+        f"• Рассылка: {NEWSLETTER_STATUS_LABELS[newsletter_consent]}\n"
+        f"• Язык интерфейса: Русский\n"
+        f"• Уведомления: Включены\n\n"
+        f"Выберите что хотите изменить:"
+    )
+    
+    reply_markup = StaticInlineKeyboardMarkup([
+        [InlineKeyboardButton(f"📧 {newsletter_action} рассылку", 
+                            callback_data=f"user_toggle_newsletter_{not newsletter_consent}")],
+        [InlineKeyboardButton("🗑️ Удалить мой аккаунт", callback_data="user_delete_confirm")],
+        BACK_TO_MENU_ROW
+    ])
+    return settings_text, reply_markup
+
+# Экран настроек существует всего в двух вариантах - собираем оба заранее
+SETTINGS_SCREENS = (_build_settings_screen(False), _build_settings_screen(True))
+
+# Максимальный размер кэша незарегистрированных пользователей и время жизни записи в нем (сек)
+UNREGISTERED_CACHE_LIMIT = 10000
+UNREGISTERED_CACHE_TTL = 300.0
+
+def callback_handler(method):
+    """Обработчик кнопки: пропускает обновления без callback_query и сразу отвечает на callback"""
+    @functools.wraps(method)
+    async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        query = update.callback_query
+        if query is None:
+            return
+        await query.answer()
+        await method(self, update, context)
+    return wrapper
 
 class UserInterface:
     """Класс для обработки взаимодействия с обычными пользователями"""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        # telegram_id пользователей, которых нет в БД -> time.monotonic() истечения записи
+        self._unregistered = {}
+        # Счетчик регистраций: отрицательный результат, прочитанный до регистрации, не кэшируется
+        self._registrations = 0
+    
+    def mark_registered(self, user_id: int) -> None:
+        """Сбросить отметку об отсутствии пользователя в БД (при постановке регистрации и после записи)"""
+        self._registrations += 1
+        self._unregistered.pop(user_id, None)
+    
+    def _is_unregistered(self, user_id: int) -> bool:
+        """Пользователь недавно не найден в БД"""
+        expires_at = self._unregistered.get(user_id)
+        if expires_at is None:
+            return False
+        if expires_at > time.monotonic():
+            return True
+        self._unregistered.pop(user_id, None)
+        return False
+    
+    def _mark_unregistered(self, user_id: int, registrations: int) -> None:
+        """Запомнить, что пользователя нет в БД, если с момента чтения никто не регистрировался"""
+        if registrations != self._registrations:
+            return
+        if len(self._unregistered) >= UNREGISTERED_CACHE_LIMIT:
+            self._unregistered.clear()
+        self._unregistered[user_id] = time.monotonic() + UNREGISTERED_CACHE_TTL
     
     async def show_user_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать главное меню пользователя"""
-        keyboard = [
-            [InlineKeyboardButton(BUTTONS['user_menu']['profile'], callback_data="user_profile")],
-            [InlineKeyboardButton(BUTTONS['user_menu']['help'], callback_data="user_help")],
-            [InlineKeyboardButton(BUTTONS['user_menu']['settings'], callback_data="user_settings")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        menu_text = (
-            "🇬🇧 <b>Главное меню</b>\n\n"
-            "Добро пожаловать! Выберите действие:"
-        )
-        
         if update.message:
-            await update.message.reply_text(menu_text, parse_mode='HTML', reply_markup=reply_markup)
+            await update.message.reply_text(USER_MENU_TEXT, parse_mode=ParseMode.HTML, reply_markup=USER_MENU_MARKUP)
         else:
-            await update.callback_query.edit_message_text(menu_text, parse_mode='HTML', reply_markup=reply_markup)
+            query = update.callback_query
+            await query.answer()
+            await query.edit_message_text(USER_MENU_TEXT, parse_mode=ParseMode.HTML, reply_markup=USER_MENU_MARKUP)
     
+    @callback_handler
     async def show_user_profile(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать профиль пользователя"""
-        query = update.callback_query
-        await query.answer()
-        
+        await self.send_user_profile(update.callback_query)
+    
+    async def send_user_profile(self, query) -> None:
+        """Профиль пользователя через query (настоящий callback_query или заглушка для /profile)"""
         user_id = query.from_user.id
         user_data = self._get_user_data(user_id)
         
@@ -48,12 +204,12 @@ class UserInterface:
             await query.edit_message_text(
                 "❌ <b>Профиль не найден</b>\n\n"
                 "Вы еще не прошли регистрацию. Нажмите /start для начала!",
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
             return
         
         # Форматируем данные профиля
-        newsletter_status = "✅ Включена" if user_data['newsletter_consent'] else "❌ Отключена"
+        newsletter_status = NEWSLETTER_STATUS_LABELS[user_data['newsletter_consent']]
         
         profile_text = (
             f"👤 <b>Ваш профиль</b>\n\n"
@@ -67,35 +223,21 @@ class UserInterface:
             f"• Telegram ID: {user_data['telegram_id']}"
         )
         
-        keyboard = [
-            [InlineKeyboardButton("✏️ Изменить данные", callback_data="user_edit_profile")],
-            [InlineKeyboardButton("🔄 Обновить профиль", callback_data="user_profile")],
-            [InlineKeyboardButton("🔙 Назад в меню", callback_data="user_menu")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(profile_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(profile_text, parse_mode=ParseMode.HTML, reply_markup=PROFILE_MARKUP)
     
+    @callback_handler
     async def show_user_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать справку для пользователя"""
         query = update.callback_query
-        await query.answer()
         
         help_text = DIALOG_TEXTS['help']['user_commands']
         
-        keyboard = [
-            [InlineKeyboardButton("📞 Связаться с поддержкой", callback_data="user_support")],
-            [InlineKeyboardButton("📚 Полезные материалы", callback_data="user_materials")],
-            [InlineKeyboardButton("🔙 Назад в меню", callback_data="user_menu")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(help_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(help_text, parse_mode=ParseMode.HTML, reply_markup=HELP_MARKUP)
     
+    @callback_handler
     async def show_user_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать настройки пользователя"""
         query = update.callback_query
-        await query.answer()
         
         user_id = query.from_user.id
         user_data = self._get_user_data(user_id)
@@ -103,36 +245,19 @@ class UserInterface:
         if not user_data:
             await query.edit_message_text(
                 "❌ Для доступа к настройкам необходимо пройти регистрацию. Нажмите /start",
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
             return
         
-        newsletter_text = "✅ Включена" if user_data['newsletter_consent'] else "❌ Отключена"
-        newsletter_action = "Отключить" if user_data['newsletter_consent'] else "Включить"
-        
-        settings_text = (
-            f"⚙️ <b>Настройки</b>\n\n"
-            f"<b>Текущие настройки:</b>\n"
-            f"• Рассылка: {newsletter_text}\n"
-            f"• Язык интерфейса: Русский\n"
-            f"• Уведомления: Включены\n\n"
-            f"Выберите что хотите изменить:"
-        )
-        
-        keyboard = [
-            [InlineKeyboardButton(f"📧 {newsletter_action} рассылку", 
-                                callback_data=f"user_toggle_newsletter_{not user_data['newsletter_consent']}")],
-            [InlineKeyboardButton("🗑️ Удалить мой аккаунт", callback_data="user_delete_confirm")],
-            [InlineKeyboardButton("🔙 Назад в меню", callback_data="user_menu")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Экран настроек зависит только от подписки - берем готовый вариант
+        settings_text, reply_markup = SETTINGS_SCREENS[user_data['newsletter_consent']]
         
-        await query.edit_message_text(settings_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(settings_text, parse_mode=ParseMode.HTML, reply_markup=reply_markup)
     
+    @callback_handler
     async def toggle_newsletter(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Переключить подписку на рассылку"""
         query = update.callback_query
-        await query.answer()
         
         # Извлекаем новое значение из callback_data
         new_value = query.data.split('_')[-1] == 'True'
@@ -145,47 +270,29 @@ class UserInterface:
             await query.edit_message_text(
                 f"✅ <b>Настройки обновлены!</b>\n\n"
                 f"Рассылка {status_text}.",
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
             
             # Возвращаемся к настройкам через 2 секунды
-            import asyncio
             await asyncio.sleep(2)
             await self.show_user_settings(update, context)
         else:
             await query.edit_message_text(
                 "❌ Произошла ошибка при обновлении настроек. Попробуйте позже.",
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
     
+    @callback_handler
     async def confirm_delete_account(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Подтверждение удаления аккаунта"""
         query = update.callback_query
-        await query.answer()
         
-        confirm_text = (
-            "⚠️ <b>ВНИМАНИЕ!</b>\n\n"
-            "Вы собираетесь <b>полностью удалить</b> свой аккаунт из системы.\n"
-            "Это действие нельзя отменить!\n\n"
-            "Будут удалены:\n"
-            "• Все ваши персональные данные\n"
-            "• История участия в клубе\n"
-            "• Настройки профиля\n\n"
-            "Вы уверены, что хотите продолжить?"
-        )
-        
-        keyboard = [
-            [InlineKeyboardButton("🗑️ Да, удалить аккаунт", callback_data="user_delete_confirmed")],
-            [InlineKeyboardButton("❌ Отмена", callback_data="user_settings")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(confirm_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(DELETE_CONFIRM_TEXT, parse_mode=ParseMode.HTML, reply_markup=DELETE_CONFIRM_MARKUP)
     
+    @callback_handler
     async def delete_user_account(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Удаление аккаунта пользователя"""
         query = update.callback_query
-        await query.answer()
         
         user_id = query.from_user.id
         success = self._delete_user_data(user_id)
@@ -196,75 +303,34 @@ class UserInterface:
                 "Ваши данные полностью удалены из системы.\n"
                 "Спасибо за участие в английском клубе!\n\n"
                 "Если захотите вернуться, просто нажмите /start",
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
         else:
             await query.edit_message_text(
                 "❌ Произошла ошибка при удалении аккаунта. Обратитесь к администратору.",
-                parse_mode='HTML'
+                parse_mode=ParseMode.HTML
             )
     
+    @callback_handler
     async def show_support_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать информацию о поддержке"""
         query = update.callback_query
-        await query.answer()
-        
-        support_text = (
-            "📞 <b>Поддержка</b>\n\n"
-            "Если у вас есть вопросы или проблемы, вы можете:\n\n"
-            "1. Написать администратору: @admin_username\n"
-            "2. Отправить email: support@englishclub.com\n"
-            "3. Позвонить: +7 (XXX) XXX-XX-XX\n\n"
-            "⏰ <b>Время работы поддержки:</b>\n"
-            "Пн-Пт: 9:00 - 18:00\n"
-            "Сб-Вс: 10:00 - 16:00\n\n"
-            "Мы стараемся отвечать в течение 24 часов!"
-        )
-        
-        keyboard = [
-            [InlineKeyboardButton("📧 Написать в поддержку", callback_data="user_write_support")],
-            [InlineKeyboardButton("🔙 Назад к справке", callback_data="user_help")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(support_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(SUPPORT_TEXT, parse_mode=ParseMode.HTML, reply_markup=SUPPORT_MARKUP)
     
+    @callback_handler
     async def show_materials(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Показать полезные материалы"""
         query = update.callback_query
-        await query.answer()
-        
-        materials_text = (
-            "📚 <b>Полезные материалы</b>\n\n"
-            "🎯 <b>Для начинающих:</b>\n"
-            "• Базовая грамматика\n"
-            "• Первые 1000 слов\n"
-            "• Простые диалоги\n\n"
-            "📈 <b>Средний уровень:</b>\n"
-            "• Времена в английском\n"
-            "• Деловая лексика\n"
-            "• Аудирование\n\n"
-            "🏆 <b>Продвинутый уровень:</b>\n"
-            "• Идиомы и фразеологизмы\n"
-            "• Подготовка к экзаменам\n"
-            "• Разговорная практика\n\n"
-            "📱 <b>Мобильные приложения:</b>\n"
-            "• Duolingo\n"
-            "• Anki для карточек\n"
-            "• BBC Learning English"
-        )
-        
-        keyboard = [
-            [InlineKeyboardButton("📖 Скачать материалы", callback_data="user_download_materials")],
-            [InlineKeyboardButton("🎮 Игры и тесты", callback_data="user_games")],
-            [InlineKeyboardButton("🔙 Назад к справке", callback_data="user_help")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(materials_text, parse_mode='HTML', reply_markup=reply_markup)
+        await query.edit_message_text(MATERIALS_TEXT, parse_mode=ParseMode.HTML, reply_markup=MATERIALS_MARKUP)
     
     def _get_user_data(self, user_id: int) -> dict:
         """Получить данные пользователя из БД"""
+        if self._is_unregistered(user_id):
+            return None
+        
+        registrations = self._registrations
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -289,10 +355,12 @@ class UserInterface:
                     'newsletter_consent': bool(result[6]),
                     'registration_date': result[7]
                 }
+            
+            self._mark_unregistered(user_id, registrations)
             return None
             
         except Exception as e:
-            print(f"Ошибка при получении данных пользователя: {e}")
+            logger.error("Ошибка при получении данных пользователя: %s", e)
             return None
     
     def _update_newsletter_consent(self, user_id: int, consent: bool) -> bool:
@@ -310,7 +378,7 @@ class UserInterface:
             return True
             
         except Exception as e:
-            print(f"Ошибка при обновлении согласия на рассылку: {e}")
+            logger.error("Ошибка при обновлении согласия на рассылку: %s", e)
             return False
     
     def _delete_user_data(self, user_id: int) -> bool:
@@ -323,10 +391,11 @@ class UserInterface:
             
             conn.commit()
             conn.close()
+            self._mark_unregistered(user_id, self._registrations)
             return True
             
         except Exception as e:
-            print(f"Ошибка при удалении данных пользователя: {e}")
+            logger.error("Ошибка при удалении данных пользователя: %s", e)
             return False
     
     def _calculate_days_in_club(self, registration_date: str) -> int: